@@ -1,80 +1,233 @@
 # csv_handler.py
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
-from tkinter import messagebox
-from Utilises import categorize
+from Utilises import categorize_series, category_map_digest
+from bank_formats import detect_bank_format, read_statement
+from exclusions import transaction_ids
+from statement_cache import statement_cache, statement_cache_key
 
 
 def load_csv(self, file_paths):
     """
-    Loads and processes multiple CSV files.
+    Loads and processes multiple CSV files in parallel.
 
     Parameters:
     file_paths (list): List of file paths to CSV files.
 
     Returns:
-    list: A list of tuples where each tuple contains processed DataFrames (debits_df, credits_df, df) and the file path.
-    """
-    data_frames = []
-    for file_path in file_paths:
-        try:
-            df = pd.read_csv(file_path)
-            # Call the process_csv method with self
-            debits_df, credits_df, processed_df = self.process_csv(df, file_path)
-            if processed_df is not None:
-                self.df = processed_df  # Assign the processed DataFrame to self.df
-                data_frames.append((debits_df, credits_df, processed_df, file_path))
-            else:
-                messagebox.showerror("Error", "Failed to process CSV file.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load CSV file '{file_path}': {e}")
+    list: A list of tuples where each tuple contains processed DataFrames (debits_df, credits_df, df) and the file path,
+    in the order the files were given.
+    """
+    loaded = {}
+    errors = []
+    for file_path, result, error in ingest_csvs(file_paths):
+        if error is None:
+            loaded[file_path] = result
+        else:
+            errors.append(f"'{file_path}': {error}")
+
+    data_frames = [loaded[file_path] for file_path in file_paths if file_path in loaded]
+    if data_frames:
+        self.df = data_frames[-1][2]  # Assign the last processed DataFrame to self.df
+    if errors:
+        # Imported here so the processing pipeline itself never needs a display
+        from tkinter import messagebox
+        messagebox.showerror("Error", "Failed to load CSV files:\n" + "\n".join(errors))
     return data_frames
 
 
-def process_csv(self, df):
-    if 'Amount' in df.columns:
-        required_columns = ['Started Date', 'Description', 'Amount', 'Balance']
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = '' if col != 'Amount' else 0
-        df = df[required_columns]
-        df['Debit'] = df.apply(lambda row: row['Amount'] if row['Amount'] < 0 else None, axis=1)
-        df['Credit'] = df.apply(lambda row: row['Amount'] if row['Amount'] > 0 else None, axis=1)
-        df['Category'] = df.apply(lambda row: categorize(row['Description']), axis=1)
-
-        debits_df = df[df['Debit'].notna()].copy()
-        credits_df = df[df['Credit'].notna()].copy()
-
-    elif 'Debit Amount' in df.columns and 'Credit Amount' in df.columns:
-        required_columns = ['Posted Transactions Date', 'Description1', 'Debit Amount', 'Credit Amount', 'Balance']
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = '' if col not in ['Debit Amount', 'Credit Amount'] else 0
-        df = df.loc[:, required_columns]
-        df['Debit'] = df['Debit Amount']
-        df['Credit'] = df['Credit Amount']
-        df['Category'] = df.apply(lambda row: categorize(row['Description1']), axis=1)
-        df.rename(columns={'Posted Transactions Date': 'Started Date', 'Description1': 'Description'}, inplace=True)
-
-        debits_df = df[(df['Debit'].notna()) & (df['Credit'].isna())].copy()
-        credits_df = df[(df['Credit'].notna()) & (df['Debit'].isna())].copy()
-
-    elif 'Debit' in df.columns and 'Credit' in df.columns:
-        required_columns = ['Date', 'Details', 'Debit', 'Credit', 'Balance']
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = '' if col not in ['Debit', 'Credit', 'Balance'] else 0
-        df = df.loc[:, required_columns]
-        df['Category'] = df.apply(lambda row: categorize(row['Details']), axis=1)
-        df.rename(columns={'Date': 'Started Date', 'Details': 'Description'}, inplace=True)
-
-        debits_df = df[(df['Debit'].notna()) & (df['Credit'].isna())].copy()
-        credits_df = df[(df['Credit'].notna()) & (df['Debit'].isna())].copy()
+def merge_csv(self, file_paths):
+    """
+    Loads multiple CSV files and merges them into one statement, dropping transactions that appear in more than
+    one file.
+
+    Parameters:
+    file_paths (list): List of file paths to CSV files.
+
+    Returns:
+    tuple: (debits_df, credits_df, df, duplicates_dropped), or None if no file could be loaded.
+    """
+    data_frames = load_csv(self, file_paths)
+    if not data_frames:
+        return None
+
+    debits_df, credits_df, df, duplicates_dropped = merge_statements(data_frames)
+    self.df = df
+    return debits_df, credits_df, df, duplicates_dropped
+
+
+def merge_statements(statements):
+    """
+    Combines processed statements into one, keeping a single copy of each transaction.
+
+    Overlapping exports give the transactions they share the same transaction IDs, so duplicates are found in
+    one hash pass over the combined ID index instead of comparing statements pairwise. The first copy of each
+    transaction is kept and the result is ordered by date.
+
+    Parameters:
+    statements (list): (debits_df, credits_df, df, file_path) tuples, as returned by load_csv.
+
+    Returns:
+    tuple: (debits_df, credits_df, df, duplicates_dropped)
+    """
+    frames = [df for _, _, df, _ in statements]
+    combined = pd.concat(frames)
+    duplicated = combined.index.duplicated(keep='first')
+    merged = combined[~duplicated].sort_values('Date', kind='stable')
+
+    # The merged statement can only be saved when every file has the same layout
+    bank_formats = {frame.attrs.get('bank_format') for frame in frames}
+    merged.attrs = {'bank_format': bank_formats.pop()} if len(bank_formats) == 1 else {}
+
+    debits_df, credits_df, merged = split_statement(merged)
+    return debits_df, credits_df, merged, int(duplicated.sum())
+
+
+def ingest_statement(file_path):
+    """
+    Reads and processes a single statement. Safe to run in a worker: it never touches the UI.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+
+    Returns:
+    tuple: (debits_df, credits_df, df, file_path)
+    """
+    debits_df, credits_df, df = load_processed_statement(file_path)
+    return debits_df, credits_df, df, file_path
+
+
+def ingest_csvs(file_paths, max_workers=None):
+    """
+    Reads and processes statements on a thread pool, yielding each one as soon as it finishes.
+
+    Parameters:
+    file_paths (list): List of file paths to CSV files.
+    max_workers (int): Size of the thread pool. Defaults to the executor's own choice.
+
+    Yields:
+    tuple: (file_path, result, error) where result is the ingest_statement tuple, or None if error is set.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(ingest_statement, file_path): file_path for file_path in file_paths}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
 
+def split_amount_column(df):
+    """
+    Splits the signed 'Amount' column into 'Debit' and 'Credit' columns in place.
+
+    Parameters:
+    df (DataFrame): DataFrame with an 'Amount' column.
+
+    Returns:
+    ndarray: The sign of each amount, so callers can select debit and credit rows without another pass.
+    """
+    amount = df['Amount']
+    sign = np.sign(amount.to_numpy(dtype=float))
+    df['Debit'] = amount.where(sign < 0)
+    df['Credit'] = amount.where(sign > 0)
+    return sign
+
+
+def prepare_statement(df):
+    """
+    Normalises a raw statement, splits debits from credits and categorizes every transaction.
+
+    Parameters:
+    df (DataFrame): The statement as read from the CSV file.
+
+    Returns:
+    tuple: (debits_df, credits_df, df)
+
+    Raises:
+    ValueError: If the columns do not match any registered bank format.
+    """
+    bank_format = detect_bank_format(df.columns)
+    if bank_format is None:
+        raise ValueError("CSV file must contain 'Amount' column or both 'Debit Amount' and 'Credit Amount' columns.")
+
+    df = bank_format.normalise(df)
+
+    if bank_format.amount_column:
+        sign = split_amount_column(df)
+        debit_mask = sign < 0
+        credit_mask = sign > 0
     else:
-        messagebox.showerror("Error",
-                             "CSV file must contain 'Amount' column or both 'Debit Amount' and 'Credit Amount' "
-                             "columns.")
+        has_debit = df['Debit'].notna().to_numpy()
+        has_credit = df['Credit'].notna().to_numpy()
+        debit_mask = has_debit & ~has_credit
+        credit_mask = has_credit & ~has_debit
+
+    df['Category'] = categorize_series(df['Description'])
+    df['Date'] = bank_format.parse_dates(df['Started Date'])
+    # Carried by the debit and credit frames too, so a saved statement can be rebuilt in the same layout
+    df.attrs['bank_format'] = bank_format.name
+    # Rows are indexed by their stable transaction ID, which exclusions and comparisons key on
+    df.index = transaction_ids(df)
+
+    # pandas cannot view non-contiguous rows, so each side is still a copy of its rows; take() gathers them
+    # straight from the positions, without the boolean-mask frame plus .copy() the split used to make
+    debits_df = df.take(np.flatnonzero(debit_mask))
+    credits_df = df.take(np.flatnonzero(credit_mask))
+
+    return debits_df, credits_df, df
+
+
+def load_processed_statement(file_path, process=prepare_statement, cache=statement_cache):
+    """
+    Returns the processed frames of a statement, from the statement cache when neither the file nor the
+    category map has changed since it was last processed.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    process (func): Turns the raw statement into (debits_df, credits_df, df) on a cache miss. A None result is
+    returned as is and not cached.
+    cache (StatementCache): The cache to use.
+
+    Returns:
+    tuple: (debits_df, credits_df, df)
+    """
+    key = statement_cache_key(file_path, category_map_digest())
+    frames = cache.get(key)
+    if frames is None:
+        frames = process(read_statement(file_path))
+        if frames is not None:
+            cache.put(key, frames)
+    return frames
+
+
+def split_statement(df):
+    """
+    Splits a processed statement into its debit and credit rows, as prepare_statement does. The two frames
+    are copies of their rows, since pandas has no view of non-contiguous rows.
+
+    Parameters:
+    df (DataFrame): The processed statement.
+
+    Returns:
+    tuple: (debits_df, credits_df, df)
+    """
+    has_debit = df['Debit'].notna().to_numpy()
+    has_credit = df['Credit'].notna().to_numpy()
+    debits_df = df.take(np.flatnonzero(has_debit & ~has_credit))
+    credits_df = df.take(np.flatnonzero(has_credit & ~has_debit))
+    return debits_df, credits_df, df
+
+
+def process_csv(self, df):
+    try:
+        debits_df, credits_df, df = prepare_statement(df)
+    except ValueError as e:
+        from tkinter import messagebox
+        messagebox.showerror("Error", str(e))
         return
 
     # Assign the processed DataFrame to self.df
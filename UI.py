@@ -1,19 +1,40 @@
 # ui.py
 
-import uuid
-from tkinter import filedialog, messagebox, simpledialog, ttk, BooleanVar
+import importlib
+import os
+import threading
+from tkinter import filedialog, messagebox, simpledialog, ttk
 
 import customtkinter as ctk
-import pandas as pd
-from matplotlib import pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from CSV_handler import process_csv
-from Utilises import open_website
-from categories import manage_categories
-from functionality import calculate_summary, load_saved_csvs, delete_saved_csv, save_csv
-from compare import execute_csv_comparison, create_comparison_results, create_comparison_summary, \
-    initiate_csv_selection, append_csv_for_comparison, retrieve_csv_data
+from jobs import JobScheduler
+from screens import ScreenManager
+
+# Loaded on a background thread once the home screen is up. Everything else the screens need is imported where it
+# is used, so startup only pays for Tk and customtkinter.
+WARM_UP_MODULES = (
+    'pandas',
+    'CSV_handler',
+    'functionality',
+    'compare',
+    'categories',
+    'recategorize',
+    'totals',
+    'transaction_table',
+    'charts',
+)
+
+
+def warm_up_imports(modules=WARM_UP_MODULES):
+    """
+    Imports the data and chart modules ahead of first use. Failures are ignored here; they surface on the screen
+    that needs the module.
+    """
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
 
 
 def display_summary(summary_data, summary_frame):
@@ -203,18 +224,37 @@ class CSVViewerApp:
         self.root.iconbitmap('favicon.ico')
         ctk.set_appearance_mode("System")
         ctk.set_default_color_theme("blue")
-        self.excluded_transactions = []
+        # Created with the first statement, so startup does not import the data modules
+        self.excluded_transactions = None
         self.selected_csvs = []
+        self.selected_csv_names = []
+        self.selection_label = None
+        self.loaded_statements = []
         self.df = None
-        self.debits_tree = None
-        self.credits_tree = None
+        self.debits_table = None
+        self.credits_table = None
+        self.running_totals = None
+        self.totals_label = None
+        self.jobs = JobScheduler(self.root)
+        # Ledger writes run one at a time, in order, and are never cancelled by navigation
+        self.ledger_jobs = JobScheduler(self.root, max_workers=1)
+        self.screens = ScreenManager()
         self.create_widgets()
+        self.root.after_idle(self.start_warm_up)
+
+    def start_warm_up(self):
+        """
+        Starts importing the data and chart modules on a background thread, once the home screen is drawn.
+        """
+        threading.Thread(target=warm_up_imports, daemon=True).start()
 
     def create_widgets(self):
         """
         Creates the initial UI widgets, including the menu and buttons.
         """
         self.clear_widgets()
+        # The statement screens cannot be reached again from here
+        self.screens.clear()
 
         self.title_label = ctk.CTkLabel(self.root, text="Welcome to the Personal Finance Tracker",
                                         font=("Helvetica", 30, "bold"))
@@ -230,19 +270,22 @@ class CSVViewerApp:
         self.load_button = ctk.CTkButton(self.button_frame, text="Load CSVs", command=self.load_csv)
         self.load_button.grid(row=0, column=0, padx=20, pady=10)
 
+        self.merge_button = ctk.CTkButton(self.button_frame, text="Merge CSVs", command=self.merge_csvs)
+        self.merge_button.grid(row=1, column=0, padx=20, pady=10)
+
         self.saved_csvs_button = ctk.CTkButton(self.button_frame, text="Saved CSVs", command=self.show_saved_csvs)
-        self.saved_csvs_button.grid(row=1, column=0, padx=20, pady=10)
+        self.saved_csvs_button.grid(row=2, column=0, padx=20, pady=10)
 
         self.manage_categories_button = ctk.CTkButton(self.button_frame, text="Manage Categories",
                                                       command=self.manage_categories)
-        self.manage_categories_button.grid(row=2, column=0, padx=20, pady=10)
+        self.manage_categories_button.grid(row=3, column=0, padx=20, pady=10)
 
         self.compare_csvs_button = ctk.CTkButton(self.button_frame, text="Compare CSVs",
                                                  command=self.select_csvs_for_comparison)
-        self.compare_csvs_button.grid(row=3, column=0, padx=20, pady=10)
+        self.compare_csvs_button.grid(row=4, column=0, padx=20, pady=10)
 
         self.exit_button = ctk.CTkButton(self.button_frame, text="Exit", command=self.confirm_exit)
-        self.exit_button.grid(row=4, column=0, padx=20, pady=10)
+        self.exit_button.grid(row=5, column=0, padx=20, pady=10)
 
         self.button_frame.grid_columnconfigure(0, weight=1)
         self.button_frame.grid_columnconfigure(1, weight=1)
@@ -253,34 +296,148 @@ class CSVViewerApp:
                                          font=("Helvetica", 20, "bold"), cursor="hand2")
         self.footer_label.pack(pady=10)
         self.footer_label.place(relx=0.5, rely=1.0, anchor='s')
-        self.footer_label.bind("<Button-1>", lambda e: open_website("https://thinklink365.com/"))
+        self.footer_label.bind("<Button-1>", self.open_contact_page)
+
+    def open_contact_page(self, event=None):
+        from Utilises import open_website
+        open_website("https://thinklink365.com/")
 
     def clear_widgets(self):
         """
-        Clears all widgets from the root window.
+        Clears the root window and cancels any background work for the screen being left. Cached screens are
+        hidden rather than destroyed.
         """
+        self.jobs.cancel_all()
+        self.screens.hide_all()
         for widget in self.root.winfo_children():
-            widget.destroy()
+            if not self.screens.owns(widget):
+                widget.destroy()
 
     def load_csv(self):
         file_paths = filedialog.askopenfilenames(filetypes=[("CSV files", "*.csv")])
         if file_paths:
-            for file_path in file_paths:
-                try:
-                    df = pd.read_csv(file_path)
-                    debits_df, credits_df, processed_df = process_csv(self, df)
-                    if processed_df is not None:
-                        self.df = processed_df  # Ensure self.df is set
-                        self.show_text_frame(debits_df, credits_df, self.df, file_path)
-                        self.update_totals_frame()  # Call after self.df is set
-                    else:
-                        messagebox.showerror("Error", "Failed to process CSV file.")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to load CSV file '{file_path}': {e}")
+            self.show_ingest_progress(list(file_paths))
+
+    def merge_csvs(self):
+        file_paths = filedialog.askopenfilenames(filetypes=[("CSV files", "*.csv")])
+        if file_paths:
+            self.show_ingest_progress(list(file_paths), merge=True)
+
+    def show_ingest_progress(self, file_paths, merge=False):
+        """
+        Parses and categorizes the selected files in the background, showing progress as each one finishes.
+
+        Parameters:
+        file_paths (list): List of file paths to CSV files.
+        merge (bool): Merge the files into one statement once they are loaded, dropping duplicate transactions.
+        """
+        from CSV_handler import ingest_statement
+        self.show_loading_screen("Merging CSV files" if merge else "Loading CSV files", self.create_widgets)
+
+        self.ingest_status_label = ctk.CTkLabel(self.root, text=f"0 of {len(file_paths)} files loaded",
+                                                font=("Helvetica", 20))
+        self.ingest_status_label.pack(pady=10)
+
+        loaded = {}
+        errors = []
+        for file_path in file_paths:
+            self.jobs.submit(ingest_statement, file_path,
+                             on_done=lambda result, path=file_path: self.record_ingest_result(
+                                 file_paths, loaded, errors, path, merge, result=result),
+                             on_error=lambda error, path=file_path: self.record_ingest_result(
+                                 file_paths, loaded, errors, path, merge, error=error))
+
+    def record_ingest_result(self, file_paths, loaded, errors, file_path, merge, result=None, error=None):
+        """
+        Records one finished file and, once every file is done, shows the last loaded statement, or the merged
+        statement when merging.
+
+        Parameters:
+        file_paths (list): List of file paths being loaded.
+        loaded (dict): Processed results so far, keyed by file path.
+        errors (list): Error messages so far.
+        file_path (str): The file that just finished.
+        merge (bool): Whether the loaded files are to be merged.
+        result (tuple): The processed (debits_df, credits_df, df, file_path), if loading succeeded.
+        error (Exception): The error raised while loading, if it failed.
+        """
+        from CSV_handler import merge_statements
+        if error is None:
+            loaded[file_path] = result
+        else:
+            errors.append(f"'{file_path}': {error}")
+
+        done = len(loaded) + len(errors)
+        self.loading_progress.set(done / len(file_paths))
+        self.ingest_status_label.configure(text=f"{done} of {len(file_paths)} files loaded "
+                                                f"(last: {os.path.basename(file_path)})")
+        if done < len(file_paths):
+            return
+
+        if errors:
+            messagebox.showerror("Error", "Failed to load CSV files:\n" + "\n".join(errors))
+
+        self.loaded_statements = [loaded[path] for path in file_paths if path in loaded]
+        if merge and len(self.loaded_statements) > 1:
+            self.jobs.submit(merge_statements, self.loaded_statements, on_done=self.show_merged_statement)
+        elif self.loaded_statements:
+            self.show_statement(self.loaded_statements[-1])
+        else:
+            self.create_widgets()
+
+    def show_merged_statement(self, result):
+        """
+        Shows a merged statement and reports how many duplicate transactions were dropped.
+
+        Parameters:
+        result (tuple): The merged (debits_df, credits_df, df, duplicates_dropped).
+        """
+        debits_df, credits_df, merged_df, duplicates_dropped = result
+        # A merged statement has no single source file to export from
+        self.show_statement((debits_df, credits_df, merged_df, None))
+        messagebox.showinfo("Merge CSVs", f"Merged {len(self.loaded_statements)} files into {len(merged_df)} "
+                                          f"transactions, dropping {duplicates_dropped} duplicates.")
+
+    def show_loading_screen(self, message, back_command):
+        """
+        Shows a progress screen while background work runs. Pressing Back cancels the work.
+
+        Parameters:
+        message (str): The title to show.
+        back_command (func): Where the Back button navigates to.
+        """
+        self.clear_widgets()
+
+        title_label = ctk.CTkLabel(self.root, text=message, font=("Helvetica", 30, "bold"))
+        title_label.pack(pady=10)
+
+        self.loading_progress = ctk.CTkProgressBar(self.root, width=400)
+        self.loading_progress.set(0)
+        self.loading_progress.pack(pady=10)
+
+        self.back_button = ctk.CTkButton(self.root, text="Back", command=back_command)
+        self.back_button.pack(side=ctk.BOTTOM, pady=10)
+
+    def show_statement(self, result):
+        """
+        Shows a processed statement in the table view.
+
+        Parameters:
+        result (tuple): The processed (debits_df, credits_df, df, file_path).
+        """
+        debits_df, credits_df, processed_df, file_path = result
+        if self.excluded_transactions is None:
+            from exclusions import ExclusionSet
+            self.excluded_transactions = ExclusionSet()
+        self.df = processed_df  # Ensure self.df is set
+        self.debits_df, self.credits_df = debits_df, credits_df
+        self.screens.clear()
+        self.show_text_frame(debits_df, credits_df, self.df, file_path)
 
     def show_text_frame(self, debits_df, credits_df, df, file_path):
         """
-        Displays the main text frame with debits and credits data side by side.
+        Displays the main text frame with debits and credits data side by side. The tables are built once per
+        statement and shown again as they were when the user comes back from the graphs or summary.
 
         Parameters:
         debits_df (DataFrame): DataFrame containing debit transactions.
@@ -288,7 +445,10 @@ class CSVViewerApp:
         df (DataFrame): The original DataFrame.
         file_path (str): The path to the CSV file.
         """
+        from totals import RunningTotals
         self.clear_widgets()
+        if self.screens.show('table'):
+            return
 
         self.table_frame = ctk.CTkFrame(self.root)
         self.table_frame.pack(padx=10, pady=10, expand=True, fill=ctk.BOTH)
@@ -310,182 +470,130 @@ class CSVViewerApp:
                                                                                           file_path))
         self.switch_to_graph_button.pack(pady=10)
 
+        self.show_trends_button = ctk.CTkButton(self.table_frame, text="Show Trends",
+                                                command=lambda: self.show_trend_frame(debits_df, credits_df, df,
+                                                                                      file_path))
+        self.show_trends_button.pack(pady=10)
+
         self.show_summary_button = ctk.CTkButton(self.table_frame, text="Show Spending Summary",
                                                  command=lambda: self.show_spending_summary(debits_df, credits_df))
         self.show_summary_button.pack(pady=10)
 
         self.save_button = ctk.CTkButton(self.table_frame, text="Save CSV",
-                                         command=lambda: save_csv(file_path,
-                                                                  simpledialog.askstring("Save CSV",
-                                                                                         "Enter a name for the CSV:"),
-                                                                  excluded_transactions=self.excluded_transactions))
+                                         command=lambda: self.save_statement(df, file_path))
         self.save_button.pack(pady=10)
 
+        self.export_button = ctk.CTkButton(self.table_frame, text="Export CSV",
+                                           command=lambda: self.export_statement(df, file_path))
+        self.export_button.pack(pady=10)
+
         self.back_button = ctk.CTkButton(self.table_frame, text="Back", command=self.create_widgets)
         self.back_button.pack(pady=10)
 
+        self.running_totals = RunningTotals(self.df, ~self.excluded_transactions.mask(self.df)) \
+            if self.df is not None else None
+        self.totals_label = None
         self.update_totals_frame()
+        self.screens.add('table', self.table_frame)
 
     def create_table(self, parent_frame, dataframe, table_type):
         """
         Creates a table for displaying transactions with inclusion/exclusion checkboxes.
+        Only the visible rows are rendered, so the table opens instantly for any statement length.
 
         Parameters:
         parent_frame (Frame): The parent frame to contain the table.
         dataframe (DataFrame): The DataFrame containing the transaction data.
         table_type (str): Indicates whether the table is for 'Debits' or 'Credits'.
         """
-        columns = list(dataframe.columns)
-        columns.append("Include")
+        from transaction_table import TransactionTable
+        # 'Date' holds the parsed form of 'Started Date' and is not shown
+        columns = [col for col in dataframe.columns if col != 'Date']
 
-        tree = ttk.Treeview(parent_frame, columns=columns, show='headings')
-        tree.pack(expand=True, fill=ctk.BOTH)
+        included = self.included_mask(dataframe)
 
-        scrollbar = ttk.Scrollbar(parent_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=ctk.RIGHT, fill=ctk.Y)
-
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, anchor="center")
+        table = TransactionTable(parent_frame, dataframe, columns, included,
+                                 on_toggle=lambda position: self.toggle_row(table_type, position))
+        table.pack(expand=True, fill=ctk.BOTH)
 
         if table_type == "Debits":
-            self.debits_tree = tree
-            self.debits_check_vars = {}
-            self.debits_tree_rows = {}
+            self.debits_table = table
         else:
-            self.credits_tree = tree
-            self.credits_check_vars = {}
-            self.credits_tree_rows = {}
-
-        for index, row in dataframe.iterrows():
-            include_var = BooleanVar()
+            self.credits_table = table
 
-            values = tuple(row[col] for col in columns[:-1])
-            unique_id = f"{table_type}_{uuid.uuid4()}"
-            item_id = tree.insert("", "end", iid=unique_id, values=values)
+    def get_table(self, table_type):
+        return self.debits_table if table_type == "Debits" else self.credits_table
 
-            if table_type == "Debits":
-                self.debits_tree_rows[unique_id] = row
-                self.debits_check_vars[unique_id] = include_var
-            else:
-                self.credits_tree_rows[unique_id] = row
-                self.credits_check_vars[unique_id] = include_var
-
-            transaction_type = 'Debit' if table_type == "Debits" else 'Credit'
-            transaction = (row['Started Date'], row['Description'], transaction_type)
-
-            include_var.set(transaction not in self.excluded_transactions)
-            tree.set(item_id, "Include", "Included" if include_var.get() else "Excluded")
+    def included_mask(self, dataframe):
+        """
+        Returns a boolean array that is True for each row that is not excluded.
 
-        tree.bind("<ButtonRelease-1>", lambda event: self.toggle_checkbox(tree, event, table_type))
+        Parameters:
+        dataframe (DataFrame): The DataFrame containing the transaction data.
+        """
+        return ~self.excluded_transactions.mask(dataframe)
 
-    def toggle_checkbox(self, tree, event, table_type):
+    def toggle_row(self, table_type, position):
         """
         Toggles the checkbox for including or excluding a transaction.
 
         Parameters:
-        tree (ttk.Treeview): The tree view widget.
-        event: The event object from the tree view.
         table_type (str): Indicates whether the table is for 'Debits' or 'Credits'.
+        position (int): Position of the clicked row in the table's DataFrame.
         """
-        item_id = tree.identify_row(event.y)
-        column = tree.identify_column(event.x)
-        include_column_index = f"#{len(tree['columns'])}"
-
-        if column == include_column_index:
-            include_var = None
-            row = None
-
-            if table_type == "Debits" and item_id in self.debits_check_vars:
-                include_var = self.debits_check_vars[item_id]
-                row = self.debits_tree_rows[item_id]
-            elif table_type == "Credits" and item_id in self.credits_check_vars:
-                include_var = self.credits_check_vars[item_id]
-                row = self.credits_tree_rows[item_id]
+        table = self.get_table(table_type)
+        transaction_id = table.dataframe.index[position]
+        included = not table.included[position]
 
-            if include_var is not None and row is not None:
-                current_state = include_var.get()
-                include_var.set(not current_state)
-                new_text = "Included" if include_var.get() else "Excluded"
-                tree.set(item_id, "Include", new_text)
+        table.included[position] = included
+        table.refresh_rows([position])
 
-                self.toggle_transaction(row, include_var)
-                self.sync_tree_with_state(tree, table_type)
+        self.toggle_transaction(transaction_id, included)
 
-    def toggle_transaction(self, row, include_var):
+    def toggle_transaction(self, transaction_id, included):
         """
-        Toggles the inclusion or exclusion of a transaction based on the checkbox state.
+        Toggles the inclusion or exclusion of a transaction and applies the change to the running totals.
 
         Parameters:
-        row (Series): The row of the DataFrame corresponding to the transaction.
-        include_var (BooleanVar): The variable controlling the inclusion/exclusion state.
-        """
-        transaction_type = 'Debit' if pd.notna(row['Debit']) and pd.isna(row['Credit']) else 'Credit'
-        transaction = (row['Started Date'], row['Description'], transaction_type)
-        if include_var.get():
-            if transaction in self.excluded_transactions:
-                self.excluded_transactions.remove(transaction)
-        else:
-            if transaction not in self.excluded_transactions:
-                self.excluded_transactions.append(transaction)
-
-        self.update_totals_frame()
-
-    def sync_tree_with_state(self, tree, table_type):
-        """
-        Synchronizes the state of the UI tree view with the current transaction data.
-
-        Parameters:
-        tree (ttk.Treeview): The tree view widget to synchronize.
-        table_type (str): The type of data ('Debits' or 'Credits') being handled.
+        transaction_id (int): The ID of the transaction.
+        included (bool): Whether the transaction is now included.
         """
-        check_vars = self.debits_check_vars if table_type == "Debits" else self.credits_check_vars
-        tree_rows = self.debits_tree_rows if table_type == "Debits" else self.credits_tree_rows
-
-        for item_id, include_var in check_vars.items():
-            row = tree_rows[item_id]
-            transaction_type = 'Debit' if pd.notna(row['Debit']) and pd.isna(row['Credit']) else 'Credit'
-            transaction = (row['Started Date'], row['Description'], transaction_type)
+        if included:
+            self.excluded_transactions.discard(transaction_id)
+        else:
+            self.excluded_transactions.add(transaction_id)
 
-            include_var.set(transaction not in self.excluded_transactions)
-            tree.set(item_id, "Include", "Included" if include_var.get() else "Excluded")
+        if self.running_totals is not None:
+            self.running_totals.set_included(self.running_totals.positions_for(transaction_id), included)
 
         self.update_totals_frame()
 
     def update_totals_frame(self):
         """
         Updates the totals frame with the current totals for debits, credits, and the ending balance.
+        The label is created once per table view and updated in place afterwards.
         """
-        if self.df is None:
+        if self.running_totals is None:
             return
 
-        remaining_df = self.df[~self.df.apply(lambda row: (
-                                                              row['Started Date'], row['Description'],
-                                                              'Debit' if pd.notna(row['Debit']) and pd.isna(
-                                                                  row['Credit']) else 'Credit'
-                                                          ) in self.excluded_transactions, axis=1)]
-
-        total_debits = remaining_df['Debit'].sum() if not remaining_df.empty else 0
-        total_credits = remaining_df['Credit'].sum() if not remaining_df.empty else 0
-        ending_balance = remaining_df['Balance'].iloc[
-            -1] if not remaining_df.empty and 'Balance' in remaining_df.columns else 0
+        totals_text = (f"Total Debits: {self.running_totals.total_debits}   |   "
+                       f"Total Credits: {self.running_totals.total_credits}   |   "
+                       f"Ending Balance: {self.running_totals.ending_balance}")
 
-        if hasattr(self, 'totals_frame'):
-            self.totals_frame.destroy()
+        if self.totals_label is not None and self.totals_label.winfo_exists():
+            self.totals_label.configure(text=totals_text)
+            return
 
         self.totals_frame = ctk.CTkFrame(self.table_frame)
         self.totals_frame.pack(padx=10, pady=10, fill=ctk.X)
 
-        totals_label = ctk.CTkLabel(self.totals_frame, text=f"Total Debits: {total_debits}   |   "
-                                                            f"Total Credits: {total_credits}   |   "
-                                                            f"Ending Balance: {ending_balance}",
-                                    font=("Helvetica", 16, "bold"))
-        totals_label.pack(pady=10)
+        self.totals_label = ctk.CTkLabel(self.totals_frame, text=totals_text, font=("Helvetica", 16, "bold"))
+        self.totals_label.pack(pady=10)
 
     def show_graph_frame(self, debits_df, credits_df, df, file_path):
         """
-        Displays the graph view and synchronizes the table with the current exclusion state.
+        Displays the graph view and synchronizes the table with the current exclusion state. The view built for
+        the current exclusions is reused; it is only rebuilt once a transaction has been included or excluded.
 
         Parameters:
         debits_df (DataFrame): DataFrame containing debit transactions.
@@ -493,14 +601,29 @@ class CSVViewerApp:
         df (DataFrame): The original DataFrame.
         file_path (str): The path to the CSV file.
         """
+        from functionality import calculate_category_totals
+        key = self.excluded_transactions.version
         self.clear_widgets()
+        if self.screens.show('graphs', key):
+            return
 
-        excluded_set = set(tuple(t) for t in self.excluded_transactions)
+        back_command = lambda: self.show_text_frame(debits_df, credits_df, df, file_path)
+        self.show_loading_screen("Preparing graphs", back_command)
 
-        remaining_debits_df = debits_df[~debits_df.apply(
-            lambda row: (row['Started Date'], row['Description'], 'Debit') in excluded_set, axis=1)]
-        remaining_credits_df = credits_df[~credits_df.apply(
-            lambda row: (row['Started Date'], row['Description'], 'Credit') in excluded_set, axis=1)]
+        self.jobs.submit(calculate_category_totals, debits_df, credits_df, self.excluded_transactions.copy(),
+                         on_done=lambda totals: self.create_graph_frame(totals, back_command, key))
+
+    def create_graph_frame(self, totals, back_command, key=None):
+        """
+        Builds the graph view from category totals that already leave out the excluded transactions.
+
+        Parameters:
+        totals (dict): The calculate_category_totals result.
+        back_command (func): Returns to the table view.
+        key (int): The exclusion version the totals were calculated with.
+        """
+        from charts import CategoryChart
+        self.clear_widgets()
 
         self.graph_frame = ctk.CTkFrame(self.root)
         self.graph_frame.pack(padx=10, pady=10, expand=True, fill=ctk.BOTH)
@@ -509,68 +632,109 @@ class CSVViewerApp:
         button_frame.pack(pady=10)
 
         self.debits_button = ctk.CTkButton(button_frame, text="Show Debits Graph",
-                                           command=lambda: self.plot_graphs(remaining_debits_df, remaining_credits_df,
-                                                                            plot_type='debits'))
+                                           command=lambda: self.plot_graphs(plot_type='debits'))
         self.debits_button.grid(row=0, column=0, padx=5, pady=10)
 
         self.credits_button = ctk.CTkButton(button_frame, text="Show Credits Graph",
-                                            command=lambda: self.plot_graphs(remaining_debits_df, remaining_credits_df,
-                                                                             plot_type='credits'))
+                                            command=lambda: self.plot_graphs(plot_type='credits'))
         self.credits_button.grid(row=0, column=1, padx=5, pady=10)
 
-        self.back_button = ctk.CTkButton(button_frame, text="Back",
-                                         command=lambda: self.show_text_frame(debits_df, credits_df, df, file_path))
+        self.back_button = ctk.CTkButton(button_frame, text="Back", command=back_command)
         self.back_button.grid(row=0, column=2, padx=5, pady=10)
 
         self.plot_frame = ctk.CTkFrame(self.graph_frame)
         self.plot_frame.pack(pady=10, expand=True, fill=ctk.BOTH)
 
-        self.plot_graphs(remaining_debits_df, remaining_credits_df, plot_type='debits')
+        self.chart = CategoryChart(self.plot_frame, totals)
+        self.plot_graphs(plot_type='debits')
+        self.screens.add('graphs', self.graph_frame, key)
 
-    def plot_graphs(self, debits_df, credits_df, plot_type):
+    def plot_graphs(self, plot_type):
         """
-        Plots the graphs using the filtered DataFrames.
+        Switches the graph view's chart to another plot type, updating the existing figure in place.
+
+        Parameters:
+        plot_type (str): The type of plot ('debits' or 'credits').
+        """
+        self.chart.show(plot_type)
+
+    def show_trend_frame(self, debits_df, credits_df, df, file_path):
+        """
+        Displays spending and income over time. Like the graph view, it is built once per exclusion state.
 
         Parameters:
         debits_df (DataFrame): DataFrame containing debit transactions.
         credits_df (DataFrame): DataFrame containing credit transactions.
-        plot_type (str): The type of plot ('debits' or 'credits').
+        df (DataFrame): The original DataFrame.
+        file_path (str): The path to the CSV file.
+        """
+        from functionality import calculate_spending_cube
+        key = self.excluded_transactions.version
+        self.clear_widgets()
+        if self.screens.show('trends', key):
+            return
+
+        back_command = lambda: self.show_text_frame(debits_df, credits_df, df, file_path)
+        self.show_loading_screen("Preparing trends", back_command)
+
+        self.jobs.submit(calculate_spending_cube, debits_df, credits_df, self.excluded_transactions.copy(),
+                         on_done=lambda cube: self.create_trend_frame(cube, back_command, key))
+
+    def create_trend_frame(self, cube, back_command, key=None):
+        """
+        Builds the trends view from a spending cube that already leaves out the excluded transactions.
+
+        Parameters:
+        cube (SpendingCube): The calculate_spending_cube result.
+        back_command (func): Returns to the table view.
+        key (int): The exclusion version the cube was built with.
         """
-        for widget in self.plot_frame.winfo_children():
-            widget.destroy()
-
-        fig, ax = plt.subplots(1, 1, figsize=(16, 8))
-
-        if plot_type == 'credits':
-            if credits_df.empty:
-                ax.text(0.5, 0.5, 'No Credits to Display', horizontalalignment='center', verticalalignment='center')
-            else:
-                credit_summary = credits_df.groupby('Category')['Credit'].sum()
-                credit_summary.plot(ax=ax, title='Total Credits by Category', kind='bar', color='green', width=0.8)
-                ax.set_xlabel('Category')
-                ax.set_ylabel('Amount')
-                ax.tick_params(axis='x', rotation=90, labelsize=10)
-                ax.set_title('Total Credits by Category')
-
-        elif plot_type == 'debits':
-            if debits_df.empty:
-                ax.text(0.5, 0.5, 'No Debits to Display', horizontalalignment='center', verticalalignment='center')
-            else:
-                debit_summary = debits_df.groupby('Category')['Debit'].sum()
-                debit_summary.plot(ax=ax, title='Total Debits by Category', kind='bar', color='red', width=0.8)
-                ax.set_xlabel('Category')
-                ax.set_ylabel('Amount')
-                ax.tick_params(axis='x', rotation=90, labelsize=10)
-                ax.set_title('Total Debits by Category')
-
-        canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(side=ctk.TOP, fill=ctk.BOTH, expand=True)
+        from charts import TrendChart
+        self.clear_widgets()
+
+        self.trend_frame = ctk.CTkFrame(self.root)
+        self.trend_frame.pack(padx=10, pady=10, expand=True, fill=ctk.BOTH)
+
+        controls_frame = ctk.CTkFrame(self.trend_frame)
+        controls_frame.pack(pady=10)
+
+        self.granularity_selector = ctk.CTkSegmentedButton(controls_frame, values=["Day", "Week", "Month"],
+                                                           command=lambda _: self.plot_trends())
+        self.granularity_selector.set("Month")
+        self.granularity_selector.grid(row=0, column=0, padx=5, pady=10)
+
+        self.trend_type_selector = ctk.CTkSegmentedButton(controls_frame, values=["Debits", "Credits"],
+                                                          command=lambda _: self.plot_trends())
+        self.trend_type_selector.set("Debits")
+        self.trend_type_selector.grid(row=0, column=1, padx=5, pady=10)
+
+        self.trend_category_menu = ctk.CTkOptionMenu(controls_frame, values=["All Categories"] + cube.categories,
+                                                     command=lambda _: self.plot_trends())
+        self.trend_category_menu.grid(row=0, column=2, padx=5, pady=10)
+
+        self.back_button = ctk.CTkButton(controls_frame, text="Back", command=back_command)
+        self.back_button.grid(row=0, column=3, padx=5, pady=10)
+
+        plot_frame = ctk.CTkFrame(self.trend_frame)
+        plot_frame.pack(pady=10, expand=True, fill=ctk.BOTH)
+
+        self.trend_chart = TrendChart(plot_frame, cube)
+        self.plot_trends()
+        self.screens.add('trends', self.trend_frame, key)
+
+    def plot_trends(self):
+        """
+        Redraws the trend chart for the selected granularity, plot type and category, re-slicing the cube.
+        """
+        category = self.trend_category_menu.get()
+        self.trend_chart.show(self.granularity_selector.get().lower(), self.trend_type_selector.get().lower(),
+                              None if category == "All Categories" else category)
 
     def show_saved_csvs(self):
         """
         Displays a list of saved CSVs for the user to select and load.
         """
+        from functionality import load_saved_csvs
         self.clear_widgets()
 
         self.title_label = ctk.CTkLabel(self.root, text="Select a saved CSV file",
@@ -616,74 +780,236 @@ class CSVViewerApp:
         Parameters:
         name (str): The name of the CSV file to delete.
         """
+        from functionality import delete_saved_csv
         delete_saved_csv(name)
         self.show_saved_csvs()
 
-    def load_saved_csv(self, name):
+    def save_statement(self, df, source_path):
         """
-        Loads a saved CSV file, restores excluded transactions, and synchronizes the UI with the data.
+        Asks for a name and saves the statement, with its current exclusions, to the ledger.
 
         Parameters:
-        name (str): The name of the saved CSV file to load.
+        df (DataFrame): The processed statement.
+        source_path (str): Where the statement came from.
         """
+        from functionality import save_csv
+        name = simpledialog.askstring("Save CSV", "Enter a name for the CSV:")
+        if not name:
+            return
+        try:
+            save_csv(df, name, excluded_transactions=self.excluded_transactions, source_path=source_path)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+
+    def export_statement(self, df, source_path):
+        """
+        Writes the statement's original CSV, without the excluded transactions, to a file the user picks.
+
+        Parameters:
+        df (DataFrame): The processed statement.
+        source_path (str): Path to the original CSV file.
+        """
+        from functionality import export_csv
+        if not source_path or not os.path.isfile(source_path):
+            messagebox.showerror("Error", "The original CSV file is no longer available to export.")
+            return
+
+        destination_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+        if not destination_path:
+            return
+
         try:
-            saved_csvs = load_saved_csvs()
-            if name in saved_csvs:
-                file_info = saved_csvs[name]
-                file_path = file_info['file_path']
-                self.excluded_transactions = [tuple(item) for item in file_info.get('excluded_transactions', [])]
+            written, left_out = export_csv(df, source_path, destination_path, self.excluded_transactions)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to export CSV file: {e}")
+            return
+        messagebox.showinfo("Export CSV", f"Exported {written} transactions, leaving out {left_out} excluded.")
 
-                df = pd.read_csv(file_path)
-                debits_df, credits_df, _ = process_csv(self, df)
+    def load_saved_csv(self, name):
+        """
+        Loads a saved statement from the ledger, restores excluded transactions, and synchronizes the UI with the data.
 
-                self.show_text_frame(debits_df, credits_df, df, file_path)
-            else:
-                messagebox.showerror("Error", f"CSV file '{name}' not found.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load CSV file: {e}")
+        Parameters:
+        name (str): The name of the saved CSV file to load.
+        """
+        from functionality import load_saved_csv
+        self.show_loading_screen(f"Loading {name}", self.show_saved_csvs)
+        self.jobs.submit(load_saved_csv, name,
+                         on_done=lambda result: self.show_saved_statement(name, result),
+                         on_error=self.show_load_error)
+
+    def show_saved_statement(self, name, result):
+        from functionality import load_saved_csvs
+        debits_df, credits_df, df, excluded_transactions = result
+        self.excluded_transactions = excluded_transactions
+        # The original file, when the ledger knows it, so the statement can still be exported
+        source_path = load_saved_csvs().get(name, {}).get('source_path')
+        self.show_statement((debits_df, credits_df, df, source_path))
+
+    def show_load_error(self, error):
+        messagebox.showerror("Error", f"Failed to load CSV file: {error}")
+        self.show_saved_csvs()
 
     def confirm_exit(self):
         """
         Confirms if the user wants to exit the application.
         """
         if messagebox.askokcancel("Exit", "Do you really want to exit?"):
+            self.jobs.shutdown()
+            self.ledger_jobs.shutdown(wait=True)
             self.root.quit()
 
     def manage_categories(self):
         """
         Opens the category management interface.
         """
+        from categories import manage_categories
         manage_categories(self, self.create_widgets)
 
+    def apply_category_changes(self, old_map, new_map):
+        """
+        Brings loaded and saved statements up to date after the category map was edited.
+
+        Only rows whose description contains a keyword the edit touched are matched again. Loaded frames and the
+        running totals are updated in place; saved statements are updated in the ledger in the background, one
+        edit at a time and in order, so each update finds the statements the previous one left on its map.
+
+        Parameters:
+        old_map (dict): The category map before the edit.
+        new_map (dict): The category map after the edit.
+        """
+        from functionality import recategorize_saved_csvs
+        from recategorize import Recategorization
+        recategorization = Recategorization(old_map, new_map)
+        if recategorization.unchanged:
+            return
+
+        frames = [self.df, self.debits_df, self.credits_df]
+        for statement in self.loaded_statements:
+            frames.extend(statement[:3])
+        seen = set()
+        for frame in frames:
+            if frame is None or id(frame) in seen:
+                continue
+            seen.add(id(frame))
+            changed = recategorization.apply(frame)
+            if frame is self.df and self.running_totals is not None and len(changed):
+                self.running_totals.set_categories(changed, frame['Category'].to_numpy()[changed])
+        # The statement screens show the old categories
+        self.screens.clear()
+
+        self.ledger_jobs.submit(recategorize_saved_csvs, old_map, new_map)
+
     def select_csvs_for_comparison(self):
-        initiate_csv_selection(self.root, self.clear_widgets, self.add_csv_to_compare, self.create_widgets,
-                               self.confirm_delete)
+        from compare import initiate_csv_selection
+        self.selected_csvs.clear()
+        self.selected_csv_names.clear()
+        self.selection_label = initiate_csv_selection(self.root, self.clear_widgets, self.add_csv_to_compare,
+                                                      self.create_widgets, self.confirm_delete,
+                                                      self.compare_selected_csvs)
 
     def add_csv_to_compare(self, name):
-        append_csv_for_comparison(self, name, self.selected_csvs, retrieve_csv_data, self.run_csv_comparison,
-                                  process_csv,
-                                  load_saved_csvs)
+        from compare import load_saved_statement
+        if name in self.selected_csv_names:
+            return
+        self.selected_csv_names.append(name)
+        self.selection_label.configure(text="Loading " + name + "...")
+        self.jobs.submit(load_saved_statement, name, on_done=self.record_selected_csv,
+                         on_error=lambda e, n=name: self.drop_selected_csv(n, e))
+
+    def record_selected_csv(self, csv_data):
+        from compare import add_loaded_csv_for_comparison
+        add_loaded_csv_for_comparison(csv_data, self.selected_csvs)
+        self.update_selection_label()
+
+    def drop_selected_csv(self, name, error):
+        self.selected_csv_names.remove(name)
+        self.update_selection_label()
+        messagebox.showerror("Error", str(error))
+
+    def update_selection_label(self):
+        names = [csv_data[2] for csv_data, _ in self.selected_csvs]
+        text = "Selected: " + ", ".join(names) if names else "No CSV files selected."
+        self.selection_label.configure(text=text)
+
+    def compare_selected_csvs(self):
+        """
+        Compares the selected CSVs: two get the detailed side by side screens, more get the statement matrix.
+        """
+        from compare import execute_statement_comparison
+        if len(self.selected_csvs) != len(self.selected_csv_names):
+            messagebox.showinfo("Please wait", "The selected CSV files are still loading.")
+            return
+        if len(self.selected_csvs) < 2:
+            messagebox.showinfo("Compare", "Select at least two CSV files to compare.")
+            return
+        if len(self.selected_csvs) == 2:
+            self.selected_csv_names.clear()
+            self.run_csv_comparison(self.selected_csvs)
+            return
+
+        csvs_to_compare = list(self.selected_csvs)
+        self.show_loading_screen("Comparing CSV files", self.select_csvs_for_comparison)
+        self.jobs.submit(execute_statement_comparison, csvs_to_compare, on_done=self.show_statement_matrix)
+
+    def show_statement_matrix(self, comparison):
+        from compare import create_statement_matrix
+        create_statement_matrix(self.root, self.clear_widgets, comparison, self.select_csvs_for_comparison,
+                                self.create_widgets)
 
     def run_csv_comparison(self, selected_csvs):
-        results, file_name1, file_name2 = execute_csv_comparison(selected_csvs)
-        self.show_comparison_results(results, file_name1, file_name2)
+        from compare import execute_csv_comparison
+        csvs_to_compare = list(selected_csvs)
+        selected_csvs.clear()
+        self.show_loading_screen("Comparing CSV files", self.select_csvs_for_comparison)
+        self.jobs.submit(execute_csv_comparison, csvs_to_compare,
+                         on_done=lambda comparison: self.show_comparison_results(*comparison))
 
     def show_comparison_results(self, results, file_name1, file_name2):
+        from compare import create_comparison_results
         create_comparison_results(self.root, self.clear_widgets, results, file_name1, file_name2, self.create_widgets,
                                   self.show_comparison_summary)
 
     def show_comparison_summary(self, results, file_name1, file_name2):
+        from compare import create_comparison_summary
 
         create_comparison_summary(self.root, self.clear_widgets, results, file_name1, file_name2, self.create_widgets)
 
     def show_spending_summary(self, debits_df, credits_df):
         """
-        Displays a summary of spending and income based on the processed data.
+        Displays a summary of spending and income based on the processed data. It is read from the running
+        aggregates the table view keeps up to date, so no transactions are grouped again.
 
         Parameters:
         debits_df (DataFrame): DataFrame containing debit transactions.
         credits_df (DataFrame): DataFrame containing credit transactions.
         """
+        from functionality import calculate_summary
+        key = self.excluded_transactions.version
+        self.clear_widgets()
+        if self.screens.show('summary', key):
+            return
+
+        back_command = lambda: self.show_text_frame(debits_df, credits_df, self.df, "")
+        if self.running_totals is not None:
+            self.create_spending_summary(self.running_totals.statement_summary(), back_command, key)
+            return
+
+        self.show_loading_screen("Calculating summary", back_command)
+
+        # Pass excluded transactions to the summary calculation function
+        self.jobs.submit(calculate_summary, debits_df, credits_df, self.excluded_transactions.copy(),
+                         on_done=lambda summary_data: self.create_spending_summary(summary_data, back_command, key))
+
+    def create_spending_summary(self, summary_data, back_command, key=None):
+        """
+        Builds the spending summary screen from calculated summary data.
+
+        Parameters:
+        summary_data (dict): The result of calculate_summary.
+        back_command (func): Returns to the table view.
+        key (int): The exclusion version the summary was calculated with.
+        """
         self.clear_widgets()
 
         summary_frame = ctk.CTkFrame(self.root)
@@ -693,19 +1019,17 @@ class CSVViewerApp:
                                    font=("Helvetica", 40, "bold"), anchor="center")
         title_label.grid(row=0, column=0, columnspan=2, pady=20)
 
-        # Pass excluded transactions to the summary calculation function
-        summary_data = calculate_summary(debits_df, credits_df, self.excluded_transactions)
-
         # Display the summary
         display_summary(summary_data, summary_frame)
 
         button_frame = ctk.CTkFrame(summary_frame)
         button_frame.grid(row=2, column=0, columnspan=2, pady=20)
 
-        self.back_button = ctk.CTkButton(button_frame, text="Back", font=("Helvetica", 18),
-                                         command=lambda: self.show_text_frame(debits_df, credits_df, self.df, ""))
+        self.back_button = ctk.CTkButton(button_frame, text="Back", font=("Helvetica", 18), command=back_command)
         self.back_button.pack(pady=10, side=ctk.LEFT)
 
         summary_frame.grid_columnconfigure(0, weight=1)
         summary_frame.grid_columnconfigure(1, weight=1)
         summary_frame.grid_rowconfigure(1, weight=1)
+
+        self.screens.add('summary', summary_frame, key)
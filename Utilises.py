@@ -1,29 +1,149 @@
 # Utilises.py
 import csv
+import hashlib
 import os
 import json
 import re
-import shutil
+import tempfile
+import threading
 import webbrowser
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
 
 SAVED_CSVS_FILE = 'saved_csvs.json'
-CSV_STORAGE_DIR = 'saved_csvs'
 CATEGORY_MAP_FILE = 'category_map.json'
 
 
+class CategoryMapCache:
+    """
+    An in-process copy of the category map file.
+
+    The file is only parsed again when its modification time or size changes, and save() writes the file and
+    updates the copy together. version goes up by one every time the map changes, so in-process caches built
+    from the map (such as the CategoryMatcher) can key on it.
+
+    Parameters:
+    path (str): Path to the category map JSON file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = 0
+        self._category_map = {}
+        # (mtime_ns, size) of the file as last read or written; False until the first read
+        self._signature = False
+        self._matcher = None
+        self._matcher_version = None
+        self._digest = None
+        self._digest_version = None
+        self._lock = threading.RLock()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+
+        category_map = {}
+        if signature is not None:
+            with open(self.path, 'r') as f:
+                try:
+                    category_map = json.load(f)
+                except json.JSONDecodeError:
+                    category_map = {}
+        self._signature = signature
+        if category_map != self._category_map or self.version == 0:
+            self._category_map = category_map
+            self.version += 1
+
+    def get(self):
+        """
+        Returns the current category map. It is shared, so callers must not modify it.
+        """
+        with self._lock:
+            self._refresh()
+            return self._category_map
+
+    def current_version(self):
+        with self._lock:
+            self._refresh()
+            return self.version
+
+    def save(self, category_map):
+        with self._lock:
+            with open(self.path, 'w') as f:
+                json.dump(category_map, f, indent=4)
+            self._category_map = {category: list(keywords) for category, keywords in category_map.items()}
+            self._signature = self._file_signature()
+            self.version += 1
+
+    def matcher(self):
+        """
+        Returns a CategoryMatcher for the current map, rebuilt only when the version changes.
+        """
+        with self._lock:
+            self._refresh()
+            if self._matcher_version != self.version:
+                self._matcher = CategoryMatcher(self._category_map)
+                self._matcher_version = self.version
+            return self._matcher
+
+    def digest(self):
+        """
+        Returns a digest of the current map. Unlike the version it is stable across runs, for on-disk caches.
+        """
+        with self._lock:
+            self._refresh()
+            if self._digest_version != self.version:
+                self._digest = digest_category_map(self._category_map)
+                self._digest_version = self.version
+            return self._digest
+
+
+def digest_category_map(category_map):
+    """
+    Returns the SHA-256 hex digest of a category map. Keyword order is part of the digest because the first
+    matching category wins.
+    """
+    encoded = json.dumps(category_map, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+_category_map_cache = CategoryMapCache(CATEGORY_MAP_FILE)
+
+
 def load_category_map():
-    if os.path.exists(CATEGORY_MAP_FILE):
-        with open(CATEGORY_MAP_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-    return {}
+    """
+    Returns a copy of the category map, from the in-process cache unless the file has changed.
+    """
+    return {category: list(keywords) for category, keywords in _category_map_cache.get().items()}
 
 
 def save_category_map(category_map):
-    with open(CATEGORY_MAP_FILE, 'w') as f:
-        json.dump(category_map, f, indent=4)
+    _category_map_cache.save(category_map)
+
+
+def category_map_version():
+    """
+    Returns a counter that goes up every time the category map changes.
+    """
+    return _category_map_cache.current_version()
+
+
+def category_map_digest():
+    """
+    Returns a digest of the category map, so results categorized with it can be cached against it on disk.
+    """
+    return _category_map_cache.digest()
 
 
 def add_keyword_to_category(category, keyword):
@@ -57,56 +177,63 @@ def delete_keyword_from_category(category, keyword):
     return False
 
 
-def save_csv_content(file_path, name, excluded_transactions=None):
-    excluded_transactions = excluded_transactions or []
-
-    if not os.path.exists(CSV_STORAGE_DIR):
-        os.makedirs(CSV_STORAGE_DIR)
-
-    new_file_path = os.path.join(CSV_STORAGE_DIR, f"{name}.csv")
-
-    # Only copy if the file paths are different
-    if file_path != new_file_path:
-        shutil.copy(file_path, new_file_path)
-
-    # Update CSV content by removing excluded transactions
-    updated_rows = []
-    with open(file_path, 'r', newline='', encoding='utf-8') as csv_file:
-        reader = csv.reader(csv_file)
-        headers = next(reader)
-        updated_rows.append(headers)
-        for row in reader:
-            if row[0] not in excluded_transactions:
-                updated_rows.append(row)
-
-    with open(new_file_path, 'w', newline='', encoding='utf-8') as csv_file:
-        writer = csv.writer(csv_file)
-        writer.writerows(updated_rows)
-
-    # Update the metadata JSON file
-    if not os.path.exists(SAVED_CSVS_FILE):
-        with open(SAVED_CSVS_FILE, 'w') as f:
-            json.dump({}, f)
-
-    with open(SAVED_CSVS_FILE, 'r+') as f:
-        try:
-            data = json.load(f)
-            if not isinstance(data, dict):
-                data = {}
-        except json.JSONDecodeError:
-            data = {}
-
-        data[name] = {
-            'file_path': new_file_path,
-            'excluded_transactions': excluded_transactions
-        }
-
-        f.seek(0)
-        f.truncate()
-        json.dump(data, f, indent=4)
-
-
-def load_saved_csvs():
+def export_csv_content(file_path, destination_path, excluded_positions=None):
+    """
+    Writes a copy of a statement CSV without its excluded transactions, in a single streaming pass.
+
+    Rows are counted by position, skipping blank lines as read_csv does, and checked against a hashed set of
+    the excluded positions. Rows go to a temporary file next to the destination, which is renamed into place
+    once complete, so an interrupted export never leaves a partial file behind.
+
+    Parameters:
+    file_path (str): Path to the original CSV file.
+    destination_path (str): Path to write the filtered CSV to. It may be the original file.
+    excluded_positions (set): Positions, among the file's data rows, of the rows to leave out.
+
+    Returns:
+    tuple: (rows written, rows left out)
+    """
+    excluded_positions = excluded_positions or set()
+    destination_dir = os.path.dirname(os.path.abspath(destination_path))
+    written = skipped = 0
+
+    temp_file = None
+    try:
+        with open(file_path, 'r', newline='', encoding='utf-8-sig') as source:
+            reader = csv.reader(source)
+            header = next(reader, [])
+
+            temp_file = tempfile.NamedTemporaryFile('w', newline='', encoding='utf-8', dir=destination_dir,
+                                                    suffix='.tmp', delete=False)
+            with temp_file:
+                writer = csv.writer(temp_file)
+                writer.writerow(header)
+                position = 0
+                for row in reader:
+                    # read_csv skips blank lines, so they have no position in the processed statement
+                    if not row:
+                        continue
+                    if position in excluded_positions:
+                        skipped += 1
+                    else:
+                        writer.writerow(row)
+                        written += 1
+                    position += 1
+
+        # Renamed only once the source is closed, so exporting over the original file also works on Windows
+        os.replace(temp_file.name, destination_path)
+    except BaseException:
+        if temp_file is not None and os.path.exists(temp_file.name):
+            os.remove(temp_file.name)
+        raise
+
+    return written, skipped
+
+
+def load_legacy_saved_csvs():
+    """
+    Reads the saved_csvs.json metadata written by older versions, for migration into the ledger.
+    """
     if not os.path.exists(SAVED_CSVS_FILE):
         return {}
 
@@ -118,33 +245,123 @@ def load_saved_csvs():
             return {}
 
 
-def delete_saved_csv(name):
-    if not os.path.exists(SAVED_CSVS_FILE):
-        return
+class CategoryMatcher:
+    """
+    Matches descriptions against every keyword in the category map in a single pass.
+
+    Keywords are compiled into an Aho-Corasick automaton. Each state remembers the
+    lowest-ranked category among the keywords ending there, so the category that
+    comes first in the map wins, exactly as the original linear scan did.
+    """
+
+    def __init__(self, category_map):
+        self.categories = [category.capitalize() for category in category_map]
+        self._goto = [{}]
+        self._fail = [0]
+        self._rank = [None]
+
+        for rank, keywords in enumerate(category_map.values()):
+            for keyword in keywords:
+                self._add_keyword(keyword.lower(), rank)
+        self._build_failure_links()
+
+    def _add_keyword(self, keyword, rank):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._rank.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+        if self._rank[state] is None or rank < self._rank[state]:
+            self._rank[state] = rank
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                inherited = self._rank[self._fail[next_state]]
+                if inherited is not None and (self._rank[next_state] is None or inherited < self._rank[next_state]):
+                    self._rank[next_state] = inherited
+
+    def match(self, description):
+        """
+        Returns the category for an already normalised (lower-cased, whitespace collapsed) description.
+        """
+        goto, fail, ranks = self._goto, self._fail, self._rank
+        best = ranks[0]
+        state = 0
+        for char in description:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            rank = ranks[state]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+                if best == 0:
+                    break
+        return self.categories[best] if best is not None else "Other"
+
+    def categorize(self, description):
+        """
+        Normalises a raw transaction description and returns its category.
+        """
+        return self.match(normalise_description(description))
+
+
+def get_category_matcher():
+    """
+    Returns the CategoryMatcher for the current category map. It is only rebuilt when the map changes.
+    """
+    return _category_map_cache.matcher()
+
+
+def normalise_description(description):
+    description = description.lower().strip()
+    return re.sub(r'\s+', ' ', description)
 
-    with open(SAVED_CSVS_FILE, 'r+') as f:
-        try:
-            data = json.load(f)
-            if name in data:
-                os.remove(data[name]['file_path'])
-                del data[name]
-                f.seek(0)
-                f.truncate()
-                json.dump(data, f, indent=4)
-        except json.JSONDecodeError:
-            pass
+
+def normalise_descriptions(descriptions):
+    """
+    Normalises a whole column of descriptions the way normalise_description does, with vectorised string operations.
+    """
+    return (descriptions.astype('string').str.lower().str.strip()
+            .str.replace(r'\s+', ' ', regex=True))
 
 
 def categorize(description):
-    category_map = load_category_map()
-    description = description.lower().strip()
-    description = re.sub(r'\s+', ' ', description)
-    for category, keywords in category_map.items():
-        for keyword in keywords:
-            pattern = re.compile(re.escape(keyword.lower()))
-            if pattern.search(description):
-                return category.capitalize()
-    return "Other"
+    return get_category_matcher().categorize(description)
+
+
+def categorize_series(descriptions):
+    """
+    Categorizes a whole column of descriptions at once.
+
+    The column is normalised with vectorised string operations and factorized, so each
+    distinct merchant is matched only once no matter how often it repeats.
+
+    Parameters:
+    descriptions (Series): Raw transaction descriptions.
+
+    Returns:
+    Series: The category of each description, aligned to the input index.
+    """
+    codes, uniques = pd.factorize(normalise_descriptions(descriptions))
+
+    matcher = get_category_matcher()
+    # The trailing "Other" is picked up by code -1, which factorize uses for missing descriptions
+    categories = np.array([matcher.match(description) for description in uniques] + ["Other"], dtype=object)
+
+    return pd.Series(categories[codes], index=descriptions.index, name='Category')
 
 
 def open_website(url):
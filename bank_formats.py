@@ -0,0 +1,163 @@
+# bank_formats.py
+
+import csv
+
+import pandas as pd
+
+
+class BankFormat:
+    """
+    Describes how one bank's CSV export maps onto the columns the app works with.
+
+    Parameters:
+    name (str): Display name of the bank.
+    signature (tuple): Header columns that identify the format.
+    columns (dict): Source columns to keep, in display order, mapped to the dtype they are parsed with.
+    date_column (str): Source column holding the transaction date.
+    description_column (str): Source column holding the transaction description.
+    date_format (str): strptime format of the date column.
+    amount_column (str): Signed amount column, for formats without separate debit and credit columns.
+    debit_column (str): Column holding debit amounts, for formats with separate debit and credit columns.
+    credit_column (str): Column holding credit amounts, for formats with separate debit and credit columns.
+    """
+
+    def __init__(self, name, signature, columns, date_column, description_column, date_format,
+                 amount_column=None, debit_column=None, credit_column=None):
+        self.name = name
+        self.signature = tuple(signature)
+        self.columns = dict(columns)
+        self.date_column = date_column
+        self.description_column = description_column
+        self.date_format = date_format
+        self.amount_column = amount_column
+        self.debit_column = debit_column
+        self.credit_column = credit_column
+
+    def matches(self, header):
+        return all(column in header for column in self.signature)
+
+    def read(self, file_path, header):
+        """
+        Parses the whole file once, reading only the declared columns with their declared dtypes.
+        """
+        usecols = [column for column in self.columns if column in header]
+        return pd.read_csv(file_path, usecols=usecols, dtype={column: self.columns[column] for column in usecols})
+
+    def normalise(self, df):
+        """
+        Selects the declared columns, fills any that are missing and renames them to the app's column names.
+        """
+        for column, dtype in self.columns.items():
+            if column not in df.columns:
+                df[column] = '' if dtype == 'str' else 0
+        df = df.loc[:, list(self.columns)]
+
+        if self.debit_column and self.debit_column != 'Debit':
+            df['Debit'] = df[self.debit_column]
+        if self.credit_column and self.credit_column != 'Credit':
+            df['Credit'] = df[self.credit_column]
+
+        return df.rename(columns={self.date_column: 'Started Date', self.description_column: 'Description'})
+
+    def app_columns(self):
+        """
+        Returns the columns normalise() produces, in order.
+        """
+        renamed = {self.date_column: 'Started Date', self.description_column: 'Description'}
+        columns = [renamed.get(column, column) for column in self.columns]
+        if self.debit_column and self.debit_column != 'Debit':
+            columns.append('Debit')
+        if self.credit_column and self.credit_column != 'Credit':
+            columns.append('Credit')
+        return columns
+
+    def parse_dates(self, dates):
+        """
+        Parses the date text with the declared format. Unparseable dates become NaT.
+        """
+        return pd.to_datetime(dates, format=self.date_format, errors='coerce')
+
+
+# Formats are tried in registration order, so more specific signatures must be registered first
+BANK_FORMATS = []
+
+
+def register_bank_format(bank_format):
+    BANK_FORMATS.append(bank_format)
+    return bank_format
+
+
+def detect_bank_format(header):
+    """
+    Returns the first registered format whose signature is present in the header, or None.
+    """
+    for bank_format in BANK_FORMATS:
+        if bank_format.matches(header):
+            return bank_format
+    return None
+
+
+def get_bank_format(name):
+    """
+    Returns the registered format with the given name, or None.
+    """
+    for bank_format in BANK_FORMATS:
+        if bank_format.name == name:
+            return bank_format
+    return None
+
+
+def read_header(file_path):
+    with open(file_path, 'r', newline='', encoding='utf-8-sig') as csv_file:
+        return next(csv.reader(csv_file), [])
+
+
+def read_statement(file_path):
+    """
+    Reads a bank statement, sniffing its format from the header line alone.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+
+    Returns:
+    DataFrame: The parsed statement. Files in an unknown format are read as-is so process_csv can report them.
+    """
+    header = read_header(file_path)
+    bank_format = detect_bank_format(header)
+    if bank_format is None:
+        return pd.read_csv(file_path)
+    return bank_format.read(file_path, header)
+
+
+register_bank_format(BankFormat(
+    name='Revolut',
+    signature=('Amount',),
+    columns={'Started Date': 'str', 'Description': 'str', 'Amount': 'float64', 'Balance': 'float64'},
+    date_column='Started Date',
+    description_column='Description',
+    date_format='%Y-%m-%d %H:%M:%S',
+    amount_column='Amount',
+))
+
+register_bank_format(BankFormat(
+    name='AIB',
+    signature=('Debit Amount', 'Credit Amount'),
+    columns={'Posted Transactions Date': 'str', 'Description1': 'str', 'Debit Amount': 'float64',
+             'Credit Amount': 'float64', 'Balance': 'float64'},
+    date_column='Posted Transactions Date',
+    description_column='Description1',
+    date_format='%d/%m/%Y',
+    debit_column='Debit Amount',
+    credit_column='Credit Amount',
+))
+
+register_bank_format(BankFormat(
+    name='Bank of Ireland',
+    signature=('Debit', 'Credit'),
+    columns={'Date': 'str', 'Details': 'str', 'Debit': 'float64', 'Credit': 'float64', 'Balance': 'float64'},
+    date_column='Date',
+    description_column='Details',
+    date_format='%d/%m/%Y',
+    debit_column='Debit',
+    credit_column='Credit',
+))
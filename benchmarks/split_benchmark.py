@@ -0,0 +1,68 @@
+# benchmarks/split_benchmark.py
+"""
+Compares the old row-wise Debit/Credit split of 'Amount' statements with split_amount_column.
+
+The memory saved comes from dropping the row-wise apply passes. The debit and credit frames are still copies of
+their rows either way, since pandas cannot return a view of non-contiguous rows.
+
+Run from the project root:
+    python -m benchmarks.split_benchmark
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from CSV_handler import split_amount_column
+
+ROW_COUNTS = [100_000, 1_000_000]
+
+
+def make_amount_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    amounts = np.round(rng.uniform(-200, 200, rows), 2)
+    return pd.DataFrame({
+        'Started Date': pd.date_range('2024-01-01', periods=rows, freq='min').astype(str),
+        'Description': rng.choice(['Tesco', 'Lidl', 'Salary', 'Netflix', 'Transfer'], rows),
+        'Amount': amounts,
+        'Balance': np.cumsum(amounts) + 1000,
+    })
+
+
+def legacy_split(df):
+    df['Debit'] = df.apply(lambda row: row['Amount'] if row['Amount'] < 0 else None, axis=1)
+    df['Credit'] = df.apply(lambda row: row['Amount'] if row['Amount'] > 0 else None, axis=1)
+    debits_df = df[df['Debit'].notna()].copy()
+    credits_df = df[df['Credit'].notna()].copy()
+    return debits_df, credits_df
+
+
+def vectorised_split(df):
+    sign = split_amount_column(df)
+    debits_df = df.take(np.flatnonzero(sign < 0))
+    credits_df = df.take(np.flatnonzero(sign > 0))
+    return debits_df, credits_df
+
+
+def measure(split, rows):
+    df = make_amount_frame(rows)
+    tracemalloc.start()
+    start = time.perf_counter()
+    split(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    print(f"{'rows':>10} {'method':>12} {'seconds':>10} {'peak MiB':>10}")
+    for rows in ROW_COUNTS:
+        for name, split in [('legacy', legacy_split), ('vectorised', vectorised_split)]:
+            elapsed, peak = measure(split, rows)
+            print(f"{rows:>10} {name:>12} {elapsed:>10.3f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
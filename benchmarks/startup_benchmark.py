@@ -0,0 +1,91 @@
+# benchmarks/startup_benchmark.py
+"""
+Measures the cold start of the app: what `import UI` costs, according to `python -X importtime`, and the time from
+interpreter start to the first drawn frame of the home screen.
+
+Every measurement runs in a fresh interpreter so nothing is already imported. The first frame needs a display;
+without one that part is reported as skipped.
+
+Run from the project root:
+    python -m benchmarks.startup_benchmark
+"""
+import re
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+TOP_IMPORTS = 10
+# Modules the home screen should not need; any of these in the startup imports is a regression
+DEFERRED_MODULES = ('numpy', 'pandas', 'matplotlib', 'sqlite3')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+FIRST_FRAME_SCRIPT = """
+import time
+start = time.perf_counter()
+import customtkinter as ctk
+from UI import CSVViewerApp
+root = ctk.CTk()
+app = CSVViewerApp(root)
+# Processes the pending map and draw events, so the home screen is on screen when this returns
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+
+def import_times(module='UI'):
+    """
+    Imports module in a fresh interpreter with -X importtime.
+
+    Returns:
+    list: (cumulative seconds, self seconds, module name, nesting depth) for every module imported.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            times.append((int(cumulative_us) / 1e6, int(self_us) / 1e6, name, len(indent) // 2))
+    return times
+
+
+def first_frame_time():
+    """
+    Returns the seconds from interpreter start to the first drawn frame, or the error if no window can be opened.
+    """
+    result = subprocess.run([sys.executable, '-c', FIRST_FRAME_SCRIPT], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, (result.stderr.strip().splitlines() or ['unknown error'])[-1]
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    runs = [import_times() for _ in range(RUNS)]
+    totals = [next(cumulative for cumulative, _, name, _ in times if name == 'UI') for times in runs]
+    print(f"import UI: median {statistics.median(totals):.3f}s, min {min(totals):.3f}s over {RUNS} runs")
+
+    imported = {name for _, _, name, _ in runs[0]}
+    deferred = [module for module in DEFERRED_MODULES if module in imported]
+    print(f"deferred modules imported at startup: {', '.join(deferred) if deferred else 'none'}")
+
+    print(f"\n{'cumulative s':>12} {'self s':>8}  module (top level, slowest first)")
+    top_level = sorted((entry for entry in runs[0] if entry[3] <= 1), reverse=True)[:TOP_IMPORTS]
+    for cumulative, self_time, name, _ in top_level:
+        print(f"{cumulative:>12.3f} {self_time:>8.3f}  {name}")
+
+    frames = []
+    for _ in range(RUNS):
+        seconds, error = first_frame_time()
+        if error is not None:
+            print(f"\nfirst frame: skipped ({error})")
+            return
+        frames.append(seconds)
+    print(f"\nfirst frame: median {statistics.median(frames):.3f}s, min {min(frames):.3f}s over {RUNS} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/summary_benchmark.py
+"""
+Compares the old lambda-based category aggregation with summary.summarise_transactions.
+
+Run from the project root:
+    python -m benchmarks.summary_benchmark
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from summary import summarise_transactions
+
+ROWS = 500_000
+CATEGORY_COUNTS = [10, 1_000, 20_000]
+
+
+def make_debits_frame(rows, categories, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Category': rng.integers(0, categories, rows).astype(str),
+        'Debit': -np.round(rng.uniform(1, 200, rows), 2),
+    })
+
+
+def legacy_summary(df):
+    return df.groupby('Category').agg(
+        total_spending=('Debit', lambda x: round(abs(x.sum()), 2)),
+        min_transaction=('Debit', lambda x: round(x.abs().min(), 2)),
+        max_transaction=('Debit', lambda x: round(x.abs().max(), 2)),
+        avg_transaction=('Debit', lambda x: round(x.abs().mean(), 2))
+    ).reset_index()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'categories':>10} {'legacy s':>10} {'engine s':>10} {'speedup':>8}")
+    for categories in CATEGORY_COUNTS:
+        df = make_debits_frame(ROWS, categories)
+        legacy, legacy_seconds = timed(legacy_summary, df)
+        engine, engine_seconds = timed(summarise_transactions, df, 'Debit', True)
+
+        # Averages can differ by a cent where a half-cent tie rounds differently in NumPy and Python
+        assert np.allclose(legacy['total_spending'], engine.by_category['total'])
+        assert np.allclose(legacy['avg_transaction'], engine.by_category['avg_transaction'], rtol=0, atol=0.0101)
+
+        print(f"{categories:>10} {legacy_seconds:>10.3f} {engine_seconds:>10.3f} "
+              f"{legacy_seconds / engine_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
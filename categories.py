@@ -85,8 +85,10 @@ def handle_add_keyword(category, keyword, app):
         messagebox.showerror("Error", "Both category and keyword must be non-empty.")
         return
 
+    old_map = load_category_map()
     success = add_keyword_to_category(category, keyword)
     if success:
+        app.apply_category_changes(old_map, load_category_map())
         manage_categories(app, app.create_widgets)  # Pass the app instance here to refresh the UI
     else:
         messagebox.showinfo("Info", f"The keyword '{keyword}' already exists in category '{category}'.")
@@ -97,8 +99,10 @@ def handle_delete_category(category, app):
     Handles deleting a category and refreshes the UI.
     """
     if messagebox.askokcancel("Delete Category", f"Do you really want to delete the category '{category}'?"):
+        old_map = load_category_map()
         success = delete_category(category)
         if success:
+            app.apply_category_changes(old_map, load_category_map())
             manage_categories(app, app.create_widgets)  # Pass the app instance here to refresh the UI
 
 
@@ -110,8 +114,10 @@ def handle_delete_keyword(category, keyword, app):
         messagebox.showerror("Error", "Please select a valid keyword to delete.")
         return
 
+    old_map = load_category_map()
     success = delete_keyword_from_category(category, keyword)
     if success:
+        app.apply_category_changes(old_map, load_category_map())
         manage_categories(app, app.create_widgets)  # Pass the app instance here to refresh the UI
     else:
         messagebox.showerror("Error", f"The keyword '{keyword}' does not exist in the category '{category}'.")
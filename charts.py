@@ -0,0 +1,168 @@
+# charts.py
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+# plot type -> (title, bar colour, text shown when there is nothing to plot)
+PLOT_TYPES = {
+    'debits': ('Total Debits by Category', 'red', 'No Debits to Display'),
+    'credits': ('Total Credits by Category', 'green', 'No Credits to Display'),
+}
+
+
+class CategoryChart:
+    """
+    The category bar chart of the graph view: one Figure and one canvas for the lifetime of the view.
+
+    Switching plot type updates the existing bars in place with set_height when the number of categories is the
+    same, otherwise replaces just the bar artists, then rescales the axes and redraws with draw_idle. The per-
+    category totals are computed once for the view, so switching never groups the transactions again.
+
+    Parameters:
+    parent (Widget): The widget the canvas is packed into.
+    totals (dict): The summary.category_totals result for the view.
+    """
+
+    def __init__(self, parent, totals):
+        self.totals = totals
+        self.plot_type = None
+        self.bars = None
+
+        self.figure = Figure(figsize=(16, 8))
+        self.ax = self.figure.add_subplot(1, 1, 1)
+        self.message = self.ax.text(0.5, 0.5, '', horizontalalignment='center', verticalalignment='center',
+                                    transform=self.ax.transAxes, visible=False)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.canvas.get_tk_widget().pack(side='top', fill='both', expand=True)
+
+    def show(self, plot_type):
+        """
+        Shows the totals of one plot type.
+
+        Parameters:
+        plot_type (str): 'debits' or 'credits'.
+        """
+        if plot_type == self.plot_type:
+            return
+        self.plot_type = plot_type
+
+        title, color, empty_text = PLOT_TYPES[plot_type]
+        totals = self.totals[plot_type]
+        heights = totals.to_numpy(dtype=float)
+        positions = np.arange(len(heights))
+
+        if self.bars is not None and len(self.bars) == len(heights):
+            for bar, height in zip(self.bars, heights):
+                bar.set_height(height)
+                bar.set_color(color)
+        else:
+            if self.bars is not None:
+                self.bars.remove()
+            self.bars = self.ax.bar(positions, heights, width=0.8, color=color)
+
+        self.ax.set_xticks(positions, labels=totals.index.astype(str))
+        self.ax.tick_params(axis='x', rotation=90, labelsize=10)
+        self.message.set_text(empty_text)
+        self.message.set_visible(totals.empty)
+
+        if totals.empty:
+            self.ax.set_title('')
+            self.ax.set_xlabel('')
+            self.ax.set_ylabel('')
+            self.ax.set_xlim(0, 1)
+            self.ax.set_ylim(0, 1)
+        else:
+            self.ax.set_title(title)
+            self.ax.set_xlabel('Category')
+            self.ax.set_ylabel('Amount')
+            self.ax.set_xlim(-0.5, len(heights) - 0.5)
+            low, high = min(heights.min(), 0), max(heights.max(), 0)
+            margin = (high - low) * 0.05 or 1
+            self.ax.set_ylim(low - margin if low < 0 else 0, high + margin if high > 0 else 0)
+
+        self.canvas.draw_idle()
+
+
+# granularity -> periods in the rolling average
+ROLLING_WINDOWS = {'day': 7, 'week': 4, 'month': 3}
+# plot type -> (what is plotted, line colour)
+TREND_TYPES = {
+    'debits': ('Spending', 'red'),
+    'credits': ('Income', 'green'),
+}
+
+
+class TrendChart:
+    """
+    The trend chart of the trends view: the total per period and its rolling average, read from a SpendingCube.
+
+    Like CategoryChart it keeps one Figure and one canvas. Changing the granularity, plot type or category
+    re-slices the cube and moves the two existing lines with set_data.
+
+    Parameters:
+    parent (Widget): The widget the canvas is packed into.
+    cube (SpendingCube): The cube of the statement's included transactions.
+    """
+
+    def __init__(self, parent, cube):
+        self.cube = cube
+        self.view = None
+
+        self.figure = Figure(figsize=(16, 8))
+        self.ax = self.figure.add_subplot(1, 1, 1)
+        self.ax.xaxis_date()
+        self.totals_line, = self.ax.plot([], [], marker='o')
+        self.average_line, = self.ax.plot([], [], linestyle='--', color='black')
+        self.message = self.ax.text(0.5, 0.5, '', horizontalalignment='center', verticalalignment='center',
+                                    transform=self.ax.transAxes, visible=False)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.canvas.get_tk_widget().pack(side='top', fill='both', expand=True)
+
+    def show(self, granularity, plot_type, category=None):
+        """
+        Shows the trend of one plot type.
+
+        Parameters:
+        granularity (str): 'day', 'week' or 'month'.
+        plot_type (str): 'debits' or 'credits'.
+        category (str): The only category to include. None includes every category.
+        """
+        if (granularity, plot_type, category) == self.view:
+            return
+        self.view = (granularity, plot_type, category)
+
+        name, color = TREND_TYPES[plot_type]
+        totals = self.cube.trend(granularity, plot_type, None if category is None else [category])
+        window = ROLLING_WINDOWS[granularity]
+        average = totals.rolling(window, min_periods=1).mean()
+
+        self.totals_line.set_data(totals.index.to_numpy(), totals.to_numpy(dtype=float))
+        self.totals_line.set_color(color)
+        self.totals_line.set_label(f"{name} per {granularity}")
+        self.average_line.set_data(average.index.to_numpy(), average.to_numpy(dtype=float))
+        self.average_line.set_label(f"{window}-{granularity} rolling average")
+
+        self.message.set_text(f"No {name} to Display")
+        self.message.set_visible(totals.empty)
+
+        if totals.empty:
+            self.ax.set_title('')
+            self.ax.set_ylabel('')
+            legend = self.ax.get_legend()
+            if legend is not None:
+                legend.remove()
+            self.ax.set_xlim(0, 1)
+            self.ax.set_ylim(0, 1)
+        else:
+            self.ax.set_title(f"{name} by {granularity.capitalize()}" + (f" - {category}" if category else ''))
+            self.ax.set_ylabel('Amount')
+            self.ax.legend(loc='upper left')
+            self.ax.relim()
+            self.ax.autoscale(True)
+            self.ax.set_ylim(bottom=0)
+            self.figure.autofmt_xdate()
+
+        self.canvas.draw_idle()
@@ -1,21 +1,28 @@
 # compare.py
 
-import os
-import pandas as pd
 import customtkinter as ctk
-from tkinter import messagebox
-from CSV_handler import process_csv
-from functionality import load_saved_csvs
+from tkinter import ttk
+from comparison import compare_statements, filter_statements
+from functionality import load_saved_csvs, load_saved_csv
+from summary import summarise_statement
 
 
-def initiate_csv_selection(root, clear_widgets, add_csv_to_compare, create_widgets, confirm_delete):
+def initiate_csv_selection(root, clear_widgets, add_csv_to_compare, create_widgets, confirm_delete,
+                           compare_selected=None):
     """
     Displays a list of saved CSVs for the user to select and compare.
+
+    Parameters:
+    compare_selected (func): Runs the comparison of every selected CSV. When given, a 'Compare Selected' button is
+    shown and any number of CSVs can be selected.
+
+    Returns:
+    CTkLabel: The label listing the selected CSVs, for the caller to update as CSVs are added.
     """
     clear_widgets()
 
-    title_label = ctk.CTkLabel(root, text="Select two CSV files to compare",
-                               font=("Helvetica", 30, "bold"))
+    title_text = "Select CSV files to compare" if compare_selected else "Select two CSV files to compare"
+    title_label = ctk.CTkLabel(root, text=title_text, font=("Helvetica", 30, "bold"))
     title_label.pack(pady=10)
 
     scrollable_frame = ctk.CTkScrollableFrame(root)
@@ -37,60 +44,52 @@ def initiate_csv_selection(root, clear_widgets, add_csv_to_compare, create_widge
         no_csv_label = ctk.CTkLabel(scrollable_frame, text="No saved CSV files found.")
         no_csv_label.pack(pady=10)
 
+    selection_label = ctk.CTkLabel(root, text="No CSV files selected.")
+    selection_label.pack(pady=5)
+
+    if compare_selected is not None:
+        compare_button = ctk.CTkButton(root, text="Compare Selected", command=compare_selected)
+        compare_button.pack(pady=5)
+
     back_button = ctk.CTkButton(root, text="Back", command=create_widgets)
     back_button.pack(pady=10)
 
+    return selection_label
+
 
-def retrieve_csv_data(self, name, load_saved_csvs, process_csv):
+def load_saved_statement(name):
     """
-    Loads a saved CSV file and returns the data without processing.
+    Loads a saved statement from the ledger without touching the UI, so it can run on a worker.
 
     Parameters:
-    name (str): The name of the saved CSV file to load.
-    load_saved_csvs (func): Function to load saved CSVs.
-    process_csv (func): Method to process a loaded CSV file.
+    name (str): The name of the saved statement to load.
 
     Returns:
-    tuple: A tuple containing (debits_df, credits_df, file_path, excluded_transactions).
-    """
-    saved_csvs = load_saved_csvs()
-    if name in saved_csvs:
-        file_info = saved_csvs[name]
-        file_path = file_info['file_path']
-        excluded_transactions = [tuple(item) for item in file_info.get('excluded_transactions', [])]
-
-        df = pd.read_csv(file_path)
+    tuple: A tuple containing (debits_df, credits_df, name, excluded_transactions).
 
-        debits_df, credits_df, _ = process_csv(self, df)  # Pass self to process_csv
-
-        return debits_df, credits_df, file_path, excluded_transactions
-    else:
-        messagebox.showerror("Error", f"CSV file '{name}' not found.")
-        return None, None, None, None
+    Raises:
+    ValueError: If no saved statement has that name.
+    """
+    debits_df, credits_df, _, excluded_transactions = load_saved_csv(name)
+    return debits_df, credits_df, name, excluded_transactions
 
 
-def append_csv_for_comparison(self, name, selected_csvs, load_csv_data, run_csv_comparison, process_csv,
-                              load_saved_csvs):
+def add_loaded_csv_for_comparison(csv_data, selected_csvs, run_csv_comparison=None):
     """
-    Adds the selected CSV to the list for comparison using load_csv_data method.
+    Adds already loaded CSV data to the list for comparison.
 
     Parameters:
-    name (str): The name of the CSV file to add.
+    csv_data (tuple): A tuple containing (debits_df, credits_df, name, excluded_transactions).
     selected_csvs (list): A list of currently selected CSV files for comparison.
-    load_csv_data (func): Function to load and process CSV data.
-    run_csv_comparison (func): Function to run the comparison once two CSVs are selected.
-    process_csv (func): Method to process a loaded CSV file.
-    load_saved_csvs (func): Function to load saved CSVs.
+    run_csv_comparison (func): Function to run the comparison once two CSVs are selected. When omitted any number
+    of CSVs can be selected and the caller starts the comparison.
     """
-    if len(selected_csvs) < 2:
-        debits_df, credits_df, file_path, excluded_transactions = load_csv_data(self, name, load_saved_csvs,
-                                                                                process_csv)
+    if run_csv_comparison is None or len(selected_csvs) < 2:
+        debits_df, credits_df, name, excluded_transactions = csv_data
         if debits_df is not None and credits_df is not None:
-            filename = os.path.splitext(os.path.basename(file_path))[0]
-            csv_data = (debits_df, credits_df, filename)
-            selected_csvs.append((csv_data, excluded_transactions))
+            selected_csvs.append(((debits_df, credits_df, name), excluded_transactions))
 
-        if len(selected_csvs) == 2:
+        if run_csv_comparison is not None and len(selected_csvs) == 2:
             return run_csv_comparison(selected_csvs)
 
 
@@ -341,11 +340,95 @@ def create_comparison_summary(root, clear_widgets, results, file_name1, file_nam
     back_button.pack(pady=10)
 
 
+def execute_statement_comparison(selected_csvs):
+    """
+    Compares every selected statement side by side. Safe to run in a worker.
+
+    Parameters:
+    selected_csvs (list): Selected statements as ((debits_df, credits_df, file_name), excluded_transactions).
+
+    Returns:
+    dict: The compare_statements result.
+    """
+    csv_data_list = [csv_data for csv_data, _ in selected_csvs]
+    excluded_transactions_list = [excluded_transactions for _, excluded_transactions in selected_csvs]
+    return compare_statements(csv_data_list, excluded_transactions_list)
+
+
+def create_statement_matrix(root, clear_widgets, comparison, back_callback, create_widgets_callback):
+    """
+    Displays the category x statement matrices of an N-way comparison, with each category's rank within its
+    statement and the change from one statement to the next.
+    """
+    clear_widgets()
+
+    title_label = ctk.CTkLabel(root, text="Statement Comparison", font=("Helvetica", 30, "bold"))
+    title_label.pack(pady=10)
+
+    notebook = ttk.Notebook(root)
+    notebook.pack(expand=True, fill="both", padx=10, pady=10)
+
+    for comparison_type in ['debits', 'credits']:
+        statement_comparison = comparison[comparison_type]
+        tab = ttk.Frame(notebook)
+        notebook.add(tab, text=comparison_type.capitalize())
+
+        matrix = statement_comparison.matrix
+        ranks = statement_comparison.ranks
+        rows = [(category, *(f"{amount:.2f} (#{rank})" for amount, rank in zip(amounts, category_ranks)),
+                 f"{total:.2f}")
+                for category, amounts, category_ranks, total in zip(matrix.index, matrix.to_numpy(),
+                                                                     ranks.to_numpy(),
+                                                                     statement_comparison.category_totals)]
+        rows.append(("Total", *(f"{total:.2f}" for total in statement_comparison.totals),
+                     f"{statement_comparison.totals.sum():.2f}"))
+        create_matrix_tree(tab, ["Category"] + statement_comparison.names + ["Total"], rows)
+
+        deltas = statement_comparison.deltas
+        if not deltas.empty:
+            delta_label = ctk.CTkLabel(tab, text="Change from previous statement", font=("Helvetica", 20, "bold"))
+            delta_label.pack(pady=5)
+            delta_rows = [(category, *(f"{delta:+.2f}" for delta in category_deltas))
+                          for category, category_deltas in zip(deltas.index, deltas.to_numpy())]
+            create_matrix_tree(tab, ["Category"] + statement_comparison.names[1:], delta_rows)
+
+    back_button = ctk.CTkButton(root, text="Back", command=back_callback)
+    back_button.pack(pady=5)
+
+    main_menu_button = ctk.CTkButton(root, text="Main Menu", command=create_widgets_callback)
+    main_menu_button.pack(pady=5)
+
+
+def create_matrix_tree(parent, columns, rows):
+    """
+    Packs a read-only Treeview showing the given rows, with a horizontal scrollbar for wide comparisons.
+    """
+    frame = ttk.Frame(parent)
+    frame.pack(expand=True, fill="both", padx=5, pady=5)
+
+    # Headings are positional so statements sharing a file name still get their own column
+    column_ids = [str(position) for position in range(len(columns))]
+    tree = ttk.Treeview(frame, columns=column_ids, show='headings')
+    scrollbar = ttk.Scrollbar(frame, orient="horizontal", command=tree.xview)
+    tree.configure(xscrollcommand=scrollbar.set)
+    scrollbar.pack(side="bottom", fill="x")
+    tree.pack(expand=True, fill="both")
+
+    for column_id, heading in zip(column_ids, columns):
+        tree.heading(column_id, text=heading)
+        tree.column(column_id, anchor="center", minwidth=100, width=120, stretch=False)
+
+    for row in rows:
+        tree.insert("", "end", values=row)
+
+
 def compare_csvs(csv_data_list, excluded_transactions_list):
     """
     Compares multiple CSV datasets (debits and credits) to provide detailed insights,
     only including the transactions that are not excluded for each specific file.
 
+    The per-category totals come from compare_statements, one groupby over all the files, not a mask per category.
+
     Parameters:
     csv_data_list (list): A list of tuples, each containing (debits_df, credits_df, file_name).
     excluded_transactions_list (list): A list of excluded transactions lists for each CSV file.
@@ -361,104 +444,19 @@ def compare_csvs(csv_data_list, excluded_transactions_list):
         'credits': {'category_comparisons': []}
     }
 
-    def filter_exclusions(df, transaction_type, excluded_set):
-        return df[
-            ~df.apply(lambda row: (row['Started Date'], row['Description'], transaction_type) in excluded_set, axis=1)]
-
-    def calculate_individual_summary(filtered_debits_df, filtered_credits_df):
-        debit_summary = filtered_debits_df.groupby('Category').agg(
-            total_spending=('Debit', lambda x: round(abs(x.sum()), 2)),
-            min_transaction=('Debit', lambda x: round(x.abs().min(), 2)),
-            max_transaction=('Debit', lambda x: round(x.abs().max(), 2)),
-            avg_transaction=('Debit', lambda x: round(x.abs().mean(), 2))
-        ).reset_index() if 'Category' in filtered_debits_df.columns else pd.DataFrame(
-            columns=['Category', 'total_spending', 'min_transaction', 'max_transaction', 'avg_transaction'])
-
-        overall_min_debit = abs(filtered_debits_df['Debit']).min() if not filtered_debits_df.empty else None
-        overall_max_debit = abs(filtered_debits_df['Debit']).max() if not filtered_debits_df.empty else None
-        total_spent = abs(filtered_debits_df['Debit']).sum() if not filtered_debits_df.empty else 0
-
-        most_expensive_debit_category = debit_summary.loc[
-            debit_summary['total_spending'].idxmax()] if not debit_summary.empty else None
-        least_expensive_debit_category = debit_summary.loc[
-            debit_summary['total_spending'].idxmin()] if not debit_summary.empty else None
-
-        credit_summary = filtered_credits_df.groupby('Category').agg(
-            total_income=('Credit', lambda x: round(x.sum(), 2)),
-            min_transaction=('Credit', lambda x: round(x.abs().min(), 2)),
-            max_transaction=('Credit', lambda x: round(x.abs().max(), 2)),
-            avg_transaction=('Credit', lambda x: round(x.abs().mean(), 2))
-        ).reset_index() if 'Category' in filtered_credits_df.columns else pd.DataFrame(
-            columns=['Category', 'total_income', 'min_transaction', 'max_transaction', 'avg_transaction'])
-
-        overall_min_credit = filtered_credits_df['Credit'].abs().min() if not filtered_credits_df.empty else None
-        overall_max_credit = filtered_credits_df['Credit'].abs().max() if not filtered_credits_df.empty else None
-        total_made = filtered_credits_df['Credit'].sum() if not filtered_credits_df.empty else 0
-
-        most_profitable_credit_category = credit_summary.loc[
-            credit_summary['total_income'].idxmax()] if not credit_summary.empty else None
-        least_profitable_credit_category = credit_summary.loc[
-            credit_summary['total_income'].idxmin()] if not credit_summary.empty else None
-
-        return {
-            'debits': {
-                'summary': debit_summary,
-                'overall_min': overall_min_debit,
-                'overall_max': overall_max_debit,
-                'total_spent': total_spent,
-                'most_expensive': most_expensive_debit_category,
-                'least_expensive': least_expensive_debit_category
-            },
-            'credits': {
-                'summary': credit_summary,
-                'overall_min': overall_min_credit,
-                'overall_max': overall_max_credit,
-                'total_made': total_made,
-                'most_profitable': most_profitable_credit_category,
-                'least_profitable': least_profitable_credit_category
-            }
-        }
-
-    for i, ((debits_df1, credits_df1, _), (debits_df2, credits_df2, _)) in enumerate(
-            zip(csv_data_list[:-1], csv_data_list[1:])):
-        excluded_set1 = set(tuple(t) for t in excluded_transactions_list[i])
-        excluded_set2 = set(tuple(t) for t in excluded_transactions_list[i + 1])
-
-        filtered_debits_df1 = filter_exclusions(debits_df1, 'Debit', excluded_set1)
-        filtered_debits_df2 = filter_exclusions(debits_df2, 'Debit', excluded_set2)
-        filtered_credits_df1 = filter_exclusions(credits_df1, 'Credit', excluded_set1)
-        filtered_credits_df2 = filter_exclusions(credits_df2, 'Credit', excluded_set2)
-
-        summary1 = calculate_individual_summary(filtered_debits_df1, filtered_credits_df1)
-        summary2 = calculate_individual_summary(filtered_debits_df2, filtered_credits_df2)
-
-        debit_categories = set(
-            filtered_debits_df1['Category'].dropna().unique()) if not filtered_debits_df1.empty else set()
-        debit_categories.update(
-            set(filtered_debits_df2['Category'].dropna().unique()) if not filtered_debits_df2.empty else set())
-
-        for category in debit_categories:
-            total1 = filtered_debits_df1[filtered_debits_df1['Category'] == category][
-                'Debit'].sum() if not filtered_debits_df1.empty and category in filtered_debits_df1[
-                'Category'].values else 0
-            total2 = filtered_debits_df2[filtered_debits_df2['Category'] == category][
-                'Debit'].sum() if not filtered_debits_df2.empty and category in filtered_debits_df2[
-                'Category'].values else 0
-            comparison_results['debits']['category_comparisons'].append((category, total1, total2))
-
-        credit_categories = set(
-            filtered_credits_df1['Category'].dropna().unique()) if not filtered_credits_df1.empty else set()
-        credit_categories.update(
-            set(filtered_credits_df2['Category'].dropna().unique()) if not filtered_credits_df2.empty else set())
-
-        for category in credit_categories:
-            total1 = filtered_credits_df1[filtered_credits_df1['Category'] == category][
-                'Credit'].sum() if not filtered_credits_df1.empty and category in filtered_credits_df1[
-                'Category'].values else 0
-            total2 = filtered_credits_df2[filtered_credits_df2['Category'] == category][
-                'Credit'].sum() if not filtered_credits_df2.empty and category in filtered_credits_df2[
-                'Category'].values else 0
-            comparison_results['credits']['category_comparisons'].append((category, total1, total2))
+    comparisons = compare_statements(csv_data_list, excluded_transactions_list, absolute=False)
+    filtered = filter_statements(csv_data_list, excluded_transactions_list)
+
+    for i in range(len(filtered) - 1):
+        for comparison_type, comparison in comparisons.items():
+            # Only the categories that appear in either file of the pair
+            present = comparison.counts.iloc[:, i:i + 2].to_numpy().sum(axis=1) > 0
+            pair = comparison.matrix.iloc[:, i:i + 2][present]
+            comparison_results[comparison_type]['category_comparisons'].extend(
+                pair.itertuples(index=True, name=None))
+
+        summary1 = summarise_statement(*filtered[i])
+        summary2 = summarise_statement(*filtered[i + 1])
 
         comparison_results['debits'].update(summary1['debits'])
         comparison_results['credits'].update(summary1['credits'])
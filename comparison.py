@@ -0,0 +1,120 @@
+# comparison.py
+
+import pandas as pd
+
+from functionality import filter_excluded_transactions
+
+
+class StatementComparison:
+    """
+    One amount column compared across any number of statements.
+
+    Parameters:
+    matrix (DataFrame): Category rows and one column per statement, in statement order, holding the summed
+    amount of each category (0 where a statement has none).
+    counts (DataFrame): Transaction counts in the same layout as matrix.
+    names (list): The statement names, matching the matrix columns.
+    """
+
+    def __init__(self, matrix, counts, names):
+        self.matrix = matrix
+        self.counts = counts
+        self.names = names
+
+    @property
+    def totals(self):
+        """
+        Total of each statement.
+        """
+        return self.matrix.sum()
+
+    @property
+    def category_totals(self):
+        """
+        Total of each category across all statements.
+        """
+        return self.matrix.sum(axis=1)
+
+    @property
+    def deltas(self):
+        """
+        Change of every statement against the one before it. The first statement has no column.
+        """
+        return self.matrix.diff(axis=1).iloc[:, 1:]
+
+    @property
+    def ranks(self):
+        """
+        Rank of each category within its statement, 1 for the largest absolute amount.
+        """
+        return self.matrix.abs().rank(ascending=False, method='min').astype(int)
+
+
+def category_matrix(frames, names, amount_column, absolute=True):
+    """
+    Builds the category x statement matrix for one amount column in a single groupby.
+
+    The frames are concatenated with a source key and grouped once on (source, Category), so the cost is one
+    pass over all rows whatever the number of statements or categories.
+
+    Parameters:
+    frames (list): The statements' debit or credit DataFrames, each with 'Category' and amount_column columns.
+    names (list): A name for each frame.
+    amount_column (str): 'Debit' or 'Credit'.
+    absolute (bool): Sum absolute amounts, so statements that store debits as negative and positive numbers compare
+    like for like.
+
+    Returns:
+    StatementComparison: The comparison matrix.
+    """
+    # Sources are positions rather than names, so two statements with the same file name stay separate
+    combined = pd.concat([pd.DataFrame({'source': position, 'Category': frame['Category'],
+                                        'amount': frame[amount_column]})
+                          for position, frame in enumerate(frames)], ignore_index=True)
+    if absolute:
+        combined['amount'] = combined['amount'].abs()
+
+    grouped = combined.groupby(['source', 'Category'])['amount'].agg(['sum', 'count'])
+    sources = range(len(frames))
+    matrix = grouped['sum'].unstack('source', fill_value=0).reindex(columns=sources, fill_value=0)
+    counts = grouped['count'].unstack('source', fill_value=0).reindex(columns=sources, fill_value=0)
+    matrix.columns = counts.columns = list(names)
+    matrix.columns.name = counts.columns.name = None
+    return StatementComparison(matrix, counts, list(names))
+
+
+def filter_statements(csv_data_list, excluded_transactions_list):
+    """
+    Leaves out each statement's excluded transactions.
+
+    Parameters:
+    csv_data_list (list): A list of tuples, each containing (debits_df, credits_df, file_name).
+    excluded_transactions_list (list): The excluded transactions of each statement.
+
+    Returns:
+    list: (debits_df, credits_df) of each statement, without its excluded transactions.
+    """
+    return [filter_excluded_transactions(debits_df, credits_df, excluded_transactions)
+            for (debits_df, credits_df, _), excluded_transactions in zip(csv_data_list, excluded_transactions_list)]
+
+
+def compare_statements(csv_data_list, excluded_transactions_list, absolute=True):
+    """
+    Compares any number of statements category by category, leaving out each statement's excluded transactions.
+
+    Parameters:
+    csv_data_list (list): A list of tuples, each containing (debits_df, credits_df, file_name), in the order the
+    statements should be compared.
+    excluded_transactions_list (list): The excluded transactions of each statement.
+    absolute (bool): Compare absolute amounts. With False, debits keep the sign their statement stores them with.
+
+    Returns:
+    dict: 'debits' and 'credits' StatementComparison objects.
+    """
+    filtered = filter_statements(csv_data_list, excluded_transactions_list)
+    names = [file_name for _, _, file_name in csv_data_list]
+
+    return {
+        'debits': category_matrix([debits_df for debits_df, _ in filtered], names, 'Debit', absolute),
+        'credits': category_matrix([credits_df for _, credits_df in filtered], names, 'Credit', absolute)
+    }
@@ -0,0 +1,138 @@
+# exclusions.py
+
+import numpy as np
+import pandas as pd
+
+# Columns a transaction ID is hashed from. Debit and Credit are hashed separately, so the type is part of the ID.
+ID_COLUMNS = ('Started Date', 'Description', 'Debit', 'Credit', 'Balance')
+TEXT_ID_COLUMNS = ('Started Date', 'Description')
+
+
+def transaction_types(dataframe):
+    """
+    Returns the transaction type of every row: 'Debit' when only the Debit column is set, otherwise 'Credit'.
+
+    Parameters:
+    dataframe (DataFrame): DataFrame with 'Debit' and 'Credit' columns.
+
+    Returns:
+    ndarray: Array of 'Debit' / 'Credit' strings aligned to the DataFrame rows.
+    """
+    is_debit = dataframe['Debit'].notna().to_numpy() & dataframe['Credit'].isna().to_numpy()
+    return np.where(is_debit, 'Debit', 'Credit')
+
+
+def transaction_ids(dataframe):
+    """
+    Returns a stable 64-bit ID for every row, computed with vectorised hashing.
+
+    The ID hashes the date, description, amounts and balance together with an occurrence counter, so a
+    merchant charged the same amount twice on one day still gets two IDs. The same transaction gets the same
+    ID every time its statement is loaded, and in any other statement that contains it.
+
+    Parameters:
+    dataframe (DataFrame): DataFrame with 'Started Date', 'Description', 'Debit' and 'Credit' columns.
+
+    Returns:
+    Index: int64 IDs aligned to the DataFrame rows, named 'Transaction ID'.
+    """
+    parts = {}
+    for column in ID_COLUMNS:
+        if column not in dataframe.columns:
+            values = np.full(len(dataframe), np.nan)
+        elif column in TEXT_ID_COLUMNS:
+            # Object dtype with '' for missing text, so every string dtype and missing marker hashes the same
+            text = dataframe[column].astype(object)
+            values = text.where(text.notna(), '').to_numpy()
+        else:
+            values = dataframe[column].to_numpy(dtype='float64')
+        parts[column] = values
+
+    content = pd.util.hash_pandas_object(pd.DataFrame(parts), index=False).to_numpy()
+    occurrence = pd.Series(content).groupby(content).cumcount().to_numpy()
+    ids = pd.util.hash_pandas_object(pd.DataFrame({'content': content, 'occurrence': occurrence}),
+                                     index=False).to_numpy()
+    # Signed, so the IDs fit SQLite integers and JSON without conversion
+    return pd.Index(ids.view('int64'), name='Transaction ID')
+
+
+class ExclusionSet:
+    """
+    The set of transactions the user has excluded, keyed by transaction ID.
+
+    Membership, add and discard are hash lookups, and mask() gives a per-row boolean array for a
+    DataFrame indexed by transaction ID. version goes up whenever the set changes, so views built from it
+    can tell when they are out of date.
+
+    Parameters:
+    transactions (iterable): Excluded transaction IDs.
+    """
+
+    def __init__(self, transactions=()):
+        # A dict keeps the order transactions were excluded in, so the saved list is stable
+        self._keys = dict.fromkeys(int(transaction_id) for transaction_id in transactions)
+        self.version = 0
+
+    @classmethod
+    def from_list(cls, items):
+        return cls(items or [])
+
+    def to_list(self):
+        return list(self._keys)
+
+    def copy(self):
+        return ExclusionSet(self._keys)
+
+    def add(self, transaction_id):
+        transaction_id = int(transaction_id)
+        if transaction_id not in self._keys:
+            self._keys[transaction_id] = None
+            self.version += 1
+
+    def discard(self, transaction_id):
+        if self._keys.pop(int(transaction_id), False) is None:
+            self.version += 1
+
+    def __contains__(self, transaction_id):
+        return int(transaction_id) in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def mask(self, dataframe):
+        """
+        Returns a boolean array that is True for every excluded row of the DataFrame.
+
+        Parameters:
+        dataframe (DataFrame): DataFrame indexed by transaction ID.
+
+        Returns:
+        ndarray: Boolean array aligned to the DataFrame rows.
+        """
+        if not self._keys or dataframe.empty:
+            return np.zeros(len(dataframe), dtype=bool)
+
+        return dataframe.index.isin(np.fromiter(self._keys, dtype='int64', count=len(self._keys)))
+
+
+def legacy_exclusions(dataframe, transactions):
+    """
+    Converts exclusions saved by older versions, keyed by (Started Date, Description, type), to an ExclusionSet.
+    Every row sharing an old key is excluded, as it was before.
+
+    Parameters:
+    dataframe (DataFrame): The processed statement the exclusions were saved with.
+    transactions (iterable): Excluded transactions as (date, description, type) sequences.
+
+    Returns:
+    ExclusionSet: The excluded transaction IDs.
+    """
+    keys = {tuple(transaction) for transaction in transactions}
+    if not keys:
+        return ExclusionSet()
+
+    rows = zip(dataframe['Started Date'], dataframe['Description'], transaction_types(dataframe).tolist())
+    return ExclusionSet(transaction_id for transaction_id, row in zip(dataframe.index, rows) if row in keys)
@@ -0,0 +1,147 @@
+# finance_tracker.py
+"""
+Headless entry point to the processing pipeline. Nothing here imports Tk, so it runs on machines without a display.
+
+Usage:
+    python -m finance_tracker batch statement1.csv statement2.csv ... --output-dir reports
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from CSV_handler import ingest_csvs
+from comparison import compare_statements
+from exclusions import ExclusionSet
+from summary import summarise_statement
+
+SUMMARY_REPORT = 'summary.json'
+COMPARISON_REPORTS = {'debits': 'comparison_debits.csv', 'credits': 'comparison_credits.csv'}
+
+
+def round_cents(amount):
+    """
+    Rounds an amount to cents as a plain float, leaving None (a side with no transactions) as is.
+    """
+    return None if amount is None else round(float(amount), 2)
+
+
+def summary_report(summary, total_key):
+    """
+    Converts one side of a summarise_statement result to plain JSON-ready values.
+
+    Parameters:
+    summary (dict): The 'debits' or 'credits' entry of a summarise_statement result.
+    total_key (str): 'total_spent' for debits, 'total_made' for credits.
+
+    Returns:
+    dict: The total, overall min and max, and one record per category, all rounded to cents like the category
+    rows.
+    """
+    return {
+        'total': round_cents(summary[total_key]),
+        'overall_min': round_cents(summary['overall_min']),
+        'overall_max': round_cents(summary['overall_max']),
+        'categories': summary['summary'].to_dict('records'),
+    }
+
+
+def statement_report(file_path, debits_df, credits_df, df):
+    """
+    Summarises one processed statement for the batch report.
+
+    Returns:
+    dict: The statement's file, bank format, transaction count, date range and debit and credit summaries.
+    """
+    summary = summarise_statement(debits_df, credits_df)
+    dates = df['Date'].dropna()
+    return {
+        'file': file_path,
+        'bank_format': df.attrs.get('bank_format'),
+        'transactions': len(df),
+        'first_date': dates.min().isoformat() if not dates.empty else None,
+        'last_date': dates.max().isoformat() if not dates.empty else None,
+        'debits': summary_report(summary['debits'], 'total_spent'),
+        'credits': summary_report(summary['credits'], 'total_made'),
+    }
+
+
+def run_batch(file_paths, output_dir, max_workers=None):
+    """
+    Ingests, categorizes, summarises and compares statements, writing the reports to output_dir.
+
+    Statements are processed on a thread pool. A file that fails to load is recorded in the report and the rest
+    of the batch carries on.
+
+    Parameters:
+    file_paths (list): Paths to the statement CSV files, in the order they should be compared.
+    output_dir (str): Directory the reports are written to. It is created if missing.
+    max_workers (int): Size of the ingest thread pool. Defaults to the executor's own choice.
+
+    Returns:
+    dict: The summary report, as written to summary.json.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    loaded = {}
+    errors = []
+    for file_path, result, error in ingest_csvs(file_paths, max_workers):
+        if error is None:
+            loaded[file_path] = result
+        else:
+            errors.append({'file': file_path, 'error': str(error)})
+    statements = [loaded[file_path] for file_path in file_paths if file_path in loaded]
+    errors.sort(key=lambda error: file_paths.index(error['file']))
+    timings['ingest'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reports = [statement_report(file_path, debits_df, credits_df, df)
+               for debits_df, credits_df, df, file_path in statements]
+    timings['summarise'] = time.perf_counter() - started
+
+    os.makedirs(output_dir, exist_ok=True)
+    if statements:
+        started = time.perf_counter()
+        # Batch files carry no exclusions
+        comparisons = compare_statements([(debits_df, credits_df, file_path)
+                                          for debits_df, credits_df, _, file_path in statements],
+                                         [ExclusionSet() for _ in statements])
+        for comparison_type, comparison in comparisons.items():
+            matrix = comparison.matrix.copy()
+            matrix['Total'] = comparison.category_totals
+            matrix.round(2).rename_axis('Category').to_csv(os.path.join(output_dir, COMPARISON_REPORTS[comparison_type]))
+        timings['compare'] = time.perf_counter() - started
+
+    report = {'statements': reports, 'errors': errors, 'timings': timings}
+    with open(os.path.join(output_dir, SUMMARY_REPORT), 'w') as f:
+        # numpy scalars are converted to the matching Python values
+        json.dump(report, f, indent=4, default=lambda value: value.item())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='finance_tracker', description="Personal Finance Tracker")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help="Process statements without the GUI and write JSON/CSV reports.")
+    batch.add_argument('files', nargs='+', help="Statement CSV files, in the order they should be compared.")
+    batch.add_argument('-o', '--output-dir', default='reports', help="Where to write the reports (default: reports).")
+    batch.add_argument('-j', '--workers', type=int, default=None, help="Number of statements to ingest at once.")
+
+    args = parser.parse_args(argv)
+    report = run_batch(args.files, args.output_dir, args.workers)
+
+    for error in report['errors']:
+        print(f"Failed to load '{error['file']}': {error['error']}", file=sys.stderr)
+    print(f"Processed {len(report['statements'])} of {len(args.files)} statements; "
+          f"reports written to {args.output_dir}")
+
+    if not report['statements']:
+        return 2
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,36 @@
 # functionality.py
-import pandas as pd
+import os
+
+import numpy as np
 
 import Utilises
-from Utilises import save_csv_content
+import ledger
+from CSV_handler import load_processed_statement
+from exclusions import ExclusionSet
+from summary import summarise_statement, category_totals
+from timeseries import SpendingCube
 
 
 # functionality.py
 
+def filter_excluded_transactions(debits_df, credits_df, excluded_transactions):
+    """
+    Drops the excluded transactions from the debits and credits DataFrames.
+
+    Parameters:
+    debits_df (DataFrame): DataFrame containing debit transactions.
+    credits_df (DataFrame): DataFrame containing credit transactions.
+    excluded_transactions (ExclusionSet): The excluded transactions.
+
+    Returns:
+    tuple: The remaining (debits_df, credits_df).
+    """
+    excluded_transactions = ExclusionSet(excluded_transactions)
+    remaining_debits_df = debits_df[~excluded_transactions.mask(debits_df)]
+    remaining_credits_df = credits_df[~excluded_transactions.mask(credits_df)]
+    return remaining_debits_df, remaining_credits_df
+
+
 def calculate_summary(debits_df, credits_df, excluded_transactions):
     """
     Calculates the summary for debits and credits DataFrames.
@@ -14,107 +38,129 @@ def calculate_summary(debits_df, credits_df, excluded_transactions):
     Parameters:
     debits_df (DataFrame): DataFrame containing debit transactions.
     credits_df (DataFrame): DataFrame containing credit transactions.
-    excluded_transactions (list): List of excluded transactions.
+    excluded_transactions (ExclusionSet): The excluded transactions.
 
     Returns:
     dict: A dictionary containing summary data for both debits and credits.
     """
-    excluded_set = set(tuple(t) for t in excluded_transactions)
     # Filtered DataFrames
-    filtered_debits_df = debits_df[~debits_df.apply(
-        lambda row: (row['Started Date'], row['Description'], 'Debit') in excluded_set, axis=1)]
-    filtered_credits_df = credits_df[~credits_df.apply(
-        lambda row: (row['Started Date'], row['Description'], 'Credit') in excluded_set, axis=1)]
-
-    # Debit summary
-    if 'Category' in filtered_debits_df.columns:
-        debit_summary = filtered_debits_df.groupby('Category').agg(
-            total_spending=('Debit', lambda x: round(abs(x.sum()), 2)),
-            min_transaction=('Debit', lambda x: round(x.abs().min(), 2)),
-            max_transaction=('Debit', lambda x: round(x.abs().max(), 2)),
-            avg_transaction=('Debit', lambda x: round(x.abs().mean(), 2))
-        ).reset_index()
-    else:
-        debit_summary = pd.DataFrame(columns=['Category', 'total_spending', 'min_transaction', 'max_transaction',
-                                              'avg_transaction'])
-
-    overall_min_debit = abs(filtered_debits_df['Debit']).min() if not filtered_debits_df.empty else None
-    overall_max_debit = abs(filtered_debits_df['Debit']).max() if not filtered_debits_df.empty else None
-    total_spent = abs(filtered_debits_df['Debit']).sum() if not filtered_debits_df.empty else 0
-
-    most_expensive_debit_category = (
-        debit_summary.loc)[debit_summary['total_spending'].idxmax()] if not debit_summary.empty else None
-    least_expensive_debit_category = (
-        debit_summary.loc)[debit_summary['total_spending'].idxmin()] if not debit_summary.empty else None
-
-    # Credit summary
-    if 'Category' in filtered_credits_df.columns:
-        credit_summary = filtered_credits_df.groupby('Category').agg(
-            total_income=('Credit', lambda x: round(x.sum(), 2)),
-            min_transaction=('Credit', lambda x: round(x.abs().min(), 2)),
-            max_transaction=('Credit', lambda x: round(x.abs().max(), 2)),
-            avg_transaction=('Credit', lambda x: round(x.abs().mean(), 2))
-        ).reset_index()
-    else:
-        credit_summary = pd.DataFrame(columns=['Category', 'total_income', 'min_transaction', 'max_transaction',
-                                               'avg_transaction'])
-
-    overall_min_credit = filtered_credits_df['Credit'].abs().min() if not filtered_credits_df.empty else None
-    overall_max_credit = filtered_credits_df['Credit'].abs().max() if not filtered_credits_df.empty else None
-    total_made = filtered_credits_df['Credit'].sum() if not filtered_credits_df.empty else 0
-
-    most_profitable_credit_category = (
-        credit_summary.loc)[credit_summary['total_income'].idxmax()] if not credit_summary.empty else None
-    least_profitable_credit_category = (
-        credit_summary.loc)[credit_summary['total_income'].idxmin()] if not credit_summary.empty else None
-
-    return {
-        'debits': {
-            'summary': debit_summary,
-            'overall_min': overall_min_debit,
-            'overall_max': overall_max_debit,
-            'total_spent': total_spent,
-            'most_expensive': most_expensive_debit_category,
-            'least_expensive': least_expensive_debit_category
-        },
-        'credits': {
-            'summary': credit_summary,
-            'overall_min': overall_min_credit,
-            'overall_max': overall_max_credit,
-            'total_made': total_made,
-            'most_profitable': most_profitable_credit_category,
-            'least_profitable': least_profitable_credit_category
-        }
-    }
+    filtered_debits_df, filtered_credits_df = filter_excluded_transactions(debits_df, credits_df,
+                                                                           excluded_transactions)
+
+    return summarise_statement(filtered_debits_df, filtered_credits_df)
+
+
+def calculate_category_totals(debits_df, credits_df, excluded_transactions):
+    """
+    Calculates the per-category totals the graph view plots, once for both plot types.
+
+    Parameters:
+    debits_df (DataFrame): DataFrame containing debit transactions.
+    credits_df (DataFrame): DataFrame containing credit transactions.
+    excluded_transactions (ExclusionSet): The excluded transactions.
+
+    Returns:
+    dict: 'debits' and 'credits' Series of totals indexed by category.
+    """
+    return category_totals(*filter_excluded_transactions(debits_df, credits_df, excluded_transactions))
+
+
+def calculate_spending_cube(debits_df, credits_df, excluded_transactions):
+    """
+    Builds the date by category cube the trend view slices.
+
+    Parameters:
+    debits_df (DataFrame): DataFrame containing debit transactions.
+    credits_df (DataFrame): DataFrame containing credit transactions.
+    excluded_transactions (ExclusionSet): The excluded transactions.
+
+    Returns:
+    SpendingCube: The cube of the included transactions.
+    """
+    return SpendingCube.from_statement(*filter_excluded_transactions(debits_df, credits_df, excluded_transactions))
 
 
 def load_saved_csvs():
     """
-    Loads the saved CSV files metadata from a JSON file.
+    Lists the statements saved in the ledger.
+
+    Returns:
+    dict: Statement name -> saved statement metadata, in the order they were saved.
+    """
+    return ledger.list_statements()
+
+
+def load_saved_csv(name):
+    """
+    Loads a statement saved in the ledger.
+
+    Parameters:
+    name (str): The name of the saved statement.
 
     Returns:
-    dict: A dictionary with saved CSV metadata.
+    tuple: (debits_df, credits_df, df, excluded_transactions)
     """
-    return Utilises.load_saved_csvs()
+    return ledger.load_statement(name)
 
 
 def delete_saved_csv(name):
     """
-    Deletes a saved CSV file and its associated metadata.
+    Deletes a saved statement and its transactions from the ledger.
 
     Parameters:
     name (str): The name of the CSV file to delete.
     """
-    Utilises.delete_saved_csv(name)
+    ledger.delete_statement(name)
+
+
+def save_csv(df, name, excluded_transactions=None, source_path=None):
+    """
+    Saves a processed statement to the ledger, flagging its excluded transactions.
+
+    Parameters:
+    df (DataFrame): The processed statement.
+    name (str): The name to save the statement under.
+    excluded_transactions (ExclusionSet): The excluded transactions.
+    source_path (str): Where the statement came from.
+    """
+    ledger.save_statement(name, df, excluded_transactions, source_path)
+
+
+def recategorize_saved_csvs(old_map, new_map):
+    """
+    Updates the categories of the saved statements after a category map edit, touching only the rows it affects.
 
+    Returns:
+    int: The number of transactions whose category changed.
+    """
+    return ledger.recategorize_saved_statements(old_map, new_map)
 
-def save_csv(file_path, name, excluded_transactions=None):
+
+def export_csv(df, file_path, destination_path, excluded_transactions=None):
     """
-    Saves the CSV content to a new file with the option to exclude certain transactions.
+    Exports a statement CSV without its excluded transactions.
+
+    The CSV file is read again and its rows are matched to the statement by transaction ID, so a source that
+    changed after the statement was loaded, for example by an earlier export over it, still leaves out exactly
+    the excluded transactions.
 
     Parameters:
+    df (DataFrame): The processed statement.
     file_path (str): Path to the original CSV file.
-    name (str): The name for the new CSV file.
-    excluded_transactions (list): List of excluded transactions.
+    destination_path (str): Path to write the filtered CSV to.
+    excluded_transactions (ExclusionSet): The excluded transactions.
+
+    Returns:
+    tuple: (rows written, rows left out)
+
+    Raises:
+    ValueError: If the CSV file holds transactions that are not in the statement.
     """
-    save_csv_content(file_path, name, excluded_transactions)
+    _, _, source_df = load_processed_statement(file_path)
+    unknown = int((~source_df.index.isin(df.index)).sum())
+    if unknown:
+        raise ValueError(f"'{os.path.basename(file_path)}' has {unknown} transactions that are not in this "
+                         f"statement. The file has changed since the statement was loaded.")
+
+    excluded_positions = set(np.flatnonzero(ExclusionSet(excluded_transactions or []).mask(source_df)).tolist())
+    return Utilises.export_csv_content(file_path, destination_path, excluded_positions)
@@ -0,0 +1,130 @@
+# jobs.py
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox
+
+
+class Job:
+    """
+    A unit of work submitted to the JobScheduler.
+
+    Parameters:
+    on_done (func): Called on the Tk main thread with the result.
+    on_error (func): Called on the Tk main thread with the exception, if the work raised.
+    """
+
+    def __init__(self, on_done=None, on_error=None):
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        """
+        Cancels the job. Work that has not started is dropped; work already running finishes but its
+        callbacks are never called.
+        """
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class JobScheduler:
+    """
+    Runs data work off the Tk main thread and hands the results back on it.
+
+    Workers put finished jobs on a queue which is drained with root.after polling, so callbacks
+    always run on the main thread and can safely touch widgets.
+
+    Parameters:
+    root (Tk): The application root window.
+    max_workers (int): Size of the worker pool. Defaults to the executor's own choice.
+    poll_interval (int): Milliseconds between polls of the result queue while jobs are pending.
+    """
+
+    def __init__(self, root, max_workers=None, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.results = queue.Queue()
+        self.pending = set()
+        self.polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """
+        Runs func(*args) on a worker. Must be called from the Tk main thread.
+
+        Returns:
+        Job: The submitted job, which can be cancelled.
+        """
+        job = Job(on_done, on_error)
+        self.pending.add(job)
+        job.future = self.executor.submit(self.run, job, func, args)
+
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_interval, self.poll)
+        return job
+
+    def run(self, job, func, args):
+        if job.cancelled:
+            return
+        try:
+            result = func(*args)
+        except Exception as e:
+            self.results.put((job, None, e))
+        else:
+            self.results.put((job, result, None))
+
+    def poll(self):
+        try:
+            while True:
+                try:
+                    job, result, error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+
+                # A callback may have cancelled the remaining jobs by navigating away
+                if job.cancelled or job not in self.pending:
+                    continue
+                self.pending.discard(job)
+
+                try:
+                    self.dispatch(job, result, error)
+                except Exception as e:
+                    # A failing callback must not stop the results of the other jobs from being delivered
+                    messagebox.showerror("Error", str(e))
+        finally:
+            if self.pending:
+                self.root.after(self.poll_interval, self.poll)
+            else:
+                self.polling = False
+
+    def dispatch(self, job, result, error):
+        """
+        Calls the job's callback for its result or error, showing the error if the job has no error callback.
+        """
+        if error is None:
+            if job.on_done is not None:
+                job.on_done(result)
+        elif job.on_error is not None:
+            job.on_error(error)
+        else:
+            messagebox.showerror("Error", str(error))
+
+    def cancel_all(self):
+        for job in self.pending:
+            job.cancel()
+        self.pending.clear()
+
+    def shutdown(self, wait=False):
+        """
+        Stops the scheduler. By default queued work is dropped; with wait=True it is finished first, for work that
+        must not be lost, such as ledger writes.
+        """
+        if wait:
+            self.executor.shutdown(wait=True)
+            return
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
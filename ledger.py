@@ -0,0 +1,335 @@
+# ledger.py
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import Utilises
+from bank_formats import get_bank_format
+from CSV_handler import load_processed_statement, split_statement
+from exclusions import ExclusionSet, legacy_exclusions, transaction_ids
+from recategorize import Recategorization
+from statement_cache import statement_cache, content_cache_key
+
+LEDGER_FILE = 'ledger.db'
+LEDGER_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# App columns stored in their own ledger columns. Anything else a bank format adds goes in 'extra' as JSON.
+NATIVE_COLUMNS = {
+    'Started Date': 'started_date',
+    'Description': 'description',
+    'Amount': 'amount',
+    'Debit': 'debit',
+    'Credit': 'credit',
+    'Balance': 'balance',
+}
+NUMERIC_COLUMNS = ('Amount', 'Debit', 'Credit', 'Balance')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    source_path TEXT,
+    bank_format TEXT NOT NULL,
+    extra_columns TEXT NOT NULL,
+    category_digest TEXT NOT NULL,
+    transaction_count INTEGER NOT NULL,
+    saved_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    statement_id INTEGER NOT NULL REFERENCES statements (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    transaction_id INTEGER,
+    started_date TEXT,
+    date TEXT,
+    description TEXT,
+    amount REAL,
+    debit REAL,
+    credit REAL,
+    balance REAL,
+    category TEXT,
+    extra TEXT,
+    excluded INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (statement_id, position)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS transactions_statement_date ON transactions (statement_id, date);
+CREATE INDEX IF NOT EXISTS transactions_category ON transactions (category);
+CREATE INDEX IF NOT EXISTS transactions_transaction_id ON transactions (transaction_id);
+"""
+
+_ledger_ready = False
+_schema_lock = threading.Lock()
+_migration_lock = threading.Lock()
+
+
+def connect():
+    """
+    Opens a connection to the ledger, creating the schema on first use. Each call gets its own connection,
+    so the ledger can be used from worker threads.
+    """
+    conn = sqlite3.connect(LEDGER_FILE)
+    conn.execute("PRAGMA foreign_keys = ON")
+    with _schema_lock:
+        global _ledger_ready
+        if not _ledger_ready:
+            upgrade_schema(conn)
+            conn.executescript(SCHEMA)
+            _ledger_ready = True
+    return conn
+
+
+def upgrade_schema(conn):
+    """
+    Adds the columns later versions introduced to a ledger created by an earlier one.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(transactions)")}
+    if columns and 'transaction_id' not in columns:
+        conn.execute("ALTER TABLE transactions ADD COLUMN transaction_id INTEGER")
+
+
+def save_statement(name, df, excluded_transactions=None, source_path=None):
+    """
+    Saves a processed statement to the ledger, replacing any statement with the same name.
+    All rows are written with one executemany inside a single transaction.
+
+    Parameters:
+    name (str): The name to save the statement under.
+    df (DataFrame): The processed statement, as returned by prepare_statement.
+    excluded_transactions (ExclusionSet): The excluded transactions, stored as a flag on each row.
+    source_path (str): Where the statement came from.
+    """
+    bank_format = get_bank_format(df.attrs.get('bank_format'))
+    if bank_format is None:
+        raise ValueError(f"Cannot save '{name}': the statement's bank format is unknown.")
+
+    extra_columns = [column for column in df.columns if column not in NATIVE_COLUMNS
+                     and column not in ('Category', 'Date', bank_format.debit_column, bank_format.credit_column)]
+    excluded = ExclusionSet(excluded_transactions or []).mask(df)
+    dates = df['Date'].dt.strftime(LEDGER_DATE_FORMAT).astype(object)
+    dates = dates.where(dates.notna(), None)
+
+    native = [df[column].tolist() if column in df.columns else [None] * len(df) for column in NATIVE_COLUMNS]
+    if extra_columns:
+        extras = [json.dumps(values, default=lambda value: value.item())
+                  for values in df[extra_columns].to_numpy(dtype=object).tolist()]
+    else:
+        extras = [None] * len(df)
+
+    rows = zip(range(len(df)), df.index.tolist(), native[0], dates.tolist(), *native[1:], df['Category'].tolist(),
+               extras, excluded.astype(int).tolist())
+
+    with closing(connect()) as conn, conn:
+        conn.execute("DELETE FROM statements WHERE name = ?", (name,))
+        cursor = conn.execute(
+            "INSERT INTO statements (name, source_path, bank_format, extra_columns, category_digest, "
+            "transaction_count, saved_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, source_path, bank_format.name, json.dumps(extra_columns), Utilises.category_map_digest(),
+             len(df), datetime.now().isoformat()))
+        conn.executemany(
+            "INSERT INTO transactions (statement_id, position, transaction_id, started_date, date, description, "
+            "amount, debit, credit, balance, category, extra, excluded) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((cursor.lastrowid,) + row for row in rows))
+
+
+def list_statements():
+    """
+    Returns the saved statements in the order they were saved.
+
+    Returns:
+    dict: Statement name -> {'source_path', 'bank_format', 'transaction_count', 'saved_at'}.
+    """
+    migrate_saved_csvs()
+    with closing(connect()) as conn:
+        rows = conn.execute("SELECT name, source_path, bank_format, transaction_count, saved_at "
+                            "FROM statements ORDER BY id").fetchall()
+    return {name: {'source_path': source_path, 'bank_format': bank_format, 'transaction_count': count,
+                   'saved_at': saved_at}
+            for name, source_path, bank_format, count, saved_at in rows}
+
+
+def delete_statement(name):
+    with closing(connect()) as conn, conn:
+        conn.execute("DELETE FROM statements WHERE name = ?", (name,))
+
+
+def load_statement(name):
+    """
+    Loads a saved statement from the ledger. Safe to run in a worker.
+
+    The frames come from the statement cache when the statement and category map are unchanged since they
+    were last built. Statements saved under an older category map are recategorized and written back.
+
+    Parameters:
+    name (str): The name of the saved statement.
+
+    Returns:
+    tuple: (debits_df, credits_df, df, excluded_transactions)
+
+    Raises:
+    ValueError: If no statement has that name.
+    """
+    with closing(connect()) as conn:
+        statement = conn.execute("SELECT id, bank_format, extra_columns, category_digest, saved_at "
+                                 "FROM statements WHERE name = ?", (name,)).fetchone()
+        if statement is None:
+            raise ValueError(f"CSV file '{name}' not found.")
+        statement_id, format_name, extra_columns, saved_digest, saved_at = statement
+
+        excluded_positions = np.array([position for position, in conn.execute(
+            "SELECT position FROM transactions WHERE statement_id = ? AND excluded = 1", (statement_id,))],
+            dtype=np.intp)
+
+        category_digest = Utilises.category_map_digest()
+        cache_key = content_cache_key(f"ledger:{statement_id}:{saved_at}", category_digest)
+        frames = statement_cache.get(cache_key)
+        if frames is None:
+            df = read_transactions(conn, statement_id, get_bank_format(format_name), json.loads(extra_columns))
+            if saved_digest != category_digest:
+                recategorize_statement(conn, statement_id, df, category_digest)
+            frames = split_statement(df)
+            statement_cache.put(cache_key, frames)
+
+    debits_df, credits_df, df = frames
+    return debits_df, credits_df, df, ExclusionSet(df.index[excluded_positions])
+
+
+def read_transactions(conn, statement_id, bank_format, extra_columns):
+    """
+    Rebuilds the processed statement DataFrame of a saved statement, in the column layout prepare_statement gives.
+    """
+    stored = pd.read_sql_query(
+        "SELECT transaction_id, started_date, date, description, amount, debit, credit, balance, category, extra "
+        "FROM transactions WHERE statement_id = ? ORDER BY position", conn, params=(statement_id,))
+
+    columns = bank_format.app_columns()
+    for column in ('Debit', 'Credit'):
+        if column not in columns:
+            columns.append(column)
+
+    extras = pd.DataFrame(stored['extra'].map(json.loads).tolist(), columns=extra_columns) \
+        if extra_columns else None
+
+    data = {}
+    for column in columns:
+        if column in NATIVE_COLUMNS:
+            values = stored[NATIVE_COLUMNS[column]]
+            data[column] = values.astype('float64') if column in NUMERIC_COLUMNS else values
+        elif column == bank_format.debit_column:
+            data[column] = stored['debit'].astype('float64')
+        elif column == bank_format.credit_column:
+            data[column] = stored['credit'].astype('float64')
+        elif extras is not None and column in extras.columns:
+            data[column] = extras[column]
+
+    df = pd.DataFrame(data)
+    df['Category'] = stored['category']
+    df['Date'] = pd.to_datetime(stored['date'], format=LEDGER_DATE_FORMAT)
+    df.attrs['bank_format'] = bank_format.name
+    if stored['transaction_id'].isna().any():
+        # Saved before transaction IDs were stored; they hash to the same values from the row contents
+        df.index = transaction_ids(df)
+    else:
+        df.index = pd.Index(stored['transaction_id'].to_numpy(dtype='int64'), name='Transaction ID')
+    return df
+
+
+def recategorize_statement(conn, statement_id, df, category_digest):
+    """
+    Recategorizes a statement saved under an older category map, in place, and writes back the rows that changed.
+    """
+    categories = Utilises.categorize_series(df['Description'])
+    changed = np.flatnonzero((categories != df['Category']).to_numpy())
+    df['Category'] = categories
+
+    with conn:
+        conn.executemany("UPDATE transactions SET category = ? WHERE statement_id = ? AND position = ?",
+                         ((categories.iat[position], statement_id, int(position)) for position in changed))
+        conn.execute("UPDATE statements SET category_digest = ? WHERE id = ?", (category_digest, statement_id))
+
+
+def recategorize_saved_statements(old_map, new_map):
+    """
+    Brings the statements saved under old_map up to date with new_map after a category map edit.
+
+    Only the distinct descriptions are matched, and only those containing a keyword the edit touched. Their new
+    categories go in a temporary table and the matching rows are rewritten with one UPDATE. Statements saved under
+    any other map are left alone; they are recategorized in full when next loaded.
+
+    Parameters:
+    old_map (dict): The category map before the edit.
+    new_map (dict): The category map after the edit.
+
+    Returns:
+    int: The number of transactions whose category changed.
+    """
+    recategorization = Recategorization(old_map, new_map)
+    old_digest = Utilises.digest_category_map(old_map)
+    new_digest = Utilises.digest_category_map(new_map)
+
+    with closing(connect()) as conn, conn:
+        # Takes the write lock before the digest lookup, so a concurrent update cannot change the digests between
+        # the lookup and the UPDATE
+        conn.execute("BEGIN IMMEDIATE")
+        statement_ids = [statement_id for statement_id, in conn.execute(
+            "SELECT id FROM statements WHERE category_digest = ?", (old_digest,))]
+        if not statement_ids:
+            return 0
+        placeholders = ', '.join('?' * len(statement_ids))
+
+        descriptions = pd.Series([description for description, in conn.execute(
+            f"SELECT DISTINCT description FROM transactions WHERE statement_id IN ({placeholders}) "
+            f"AND description IS NOT NULL", statement_ids)], dtype=object)
+        positions, categories = recategorization.affected(descriptions)
+        new_categories = zip(descriptions.to_numpy()[positions].tolist(), categories.tolist())
+
+        changed = 0
+        if len(positions):
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS recategorized (description TEXT PRIMARY KEY, category TEXT)")
+            conn.execute("DELETE FROM recategorized")
+            conn.executemany("INSERT INTO recategorized (description, category) VALUES (?, ?)", new_categories)
+            changed = conn.execute(
+                f"UPDATE transactions SET category = recategorized.category FROM recategorized "
+                f"WHERE transactions.description = recategorized.description "
+                f"AND transactions.category IS NOT recategorized.category "
+                f"AND transactions.statement_id IN ({placeholders})", statement_ids).rowcount
+            conn.execute("DROP TABLE recategorized")
+
+        conn.execute(f"UPDATE statements SET category_digest = ? WHERE id IN ({placeholders})",
+                     [new_digest] + statement_ids)
+    return changed
+
+
+def migrate_saved_csvs():
+    """
+    Moves statements saved by older versions (saved_csvs.json plus a copied CSV per statement) into the
+    ledger, once. The JSON file is renamed afterwards; the copied CSV files are left where they are.
+    """
+    if not os.path.exists(Utilises.SAVED_CSVS_FILE):
+        return
+
+    with _migration_lock:
+        if not os.path.exists(Utilises.SAVED_CSVS_FILE):
+            return
+
+        with closing(connect()) as conn:
+            existing = {name for name, in conn.execute("SELECT name FROM statements")}
+
+        for name, info in Utilises.load_legacy_saved_csvs().items():
+            file_path = info.get('file_path')
+            if name in existing or not file_path or not os.path.exists(file_path):
+                continue
+            try:
+                _, _, df = load_processed_statement(file_path)
+            except ValueError:
+                continue
+            save_statement(name, df, legacy_exclusions(df, info.get('excluded_transactions') or []), file_path)
+
+        os.replace(Utilises.SAVED_CSVS_FILE, Utilises.SAVED_CSVS_FILE + '.migrated')
@@ -1,9 +1,12 @@
 import ctypes
+import sys
+
 import customtkinter as ctk
 from UI import CSVViewerApp
 
 myappid = 'personal.finance.tracker'
-ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
+if sys.platform == 'win32':
+    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
 
 if __name__ == "__main__":
     root = ctk.CTk()
@@ -0,0 +1,131 @@
+# recategorize.py
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from Utilises import CategoryMatcher, normalise_descriptions
+
+
+def keyword_owners(category_map):
+    """
+    Returns the category each keyword belongs to. A keyword listed under several categories belongs to the first,
+    since that category wins every match the keyword is part of.
+
+    Parameters:
+    category_map (dict): Category -> list of keywords.
+
+    Returns:
+    dict: Lower-cased keyword -> category.
+    """
+    owners = {}
+    for category, keywords in category_map.items():
+        for keyword in keywords:
+            owners.setdefault(keyword.lower(), category)
+    return owners
+
+
+def changed_keywords(old_map, new_map):
+    """
+    Returns the keywords whose category differs between two category maps.
+
+    As long as the categories both maps share keep their order, a description can only change category if it
+    contains one of these keywords.
+
+    Parameters:
+    old_map (dict): The category map before the edit.
+    new_map (dict): The category map after the edit.
+
+    Returns:
+    set: The changed keywords, or None if shared categories were reordered and every description has to be
+    matched again.
+    """
+    if [category for category in old_map if category in new_map] != \
+            [category for category in new_map if category in old_map]:
+        return None
+
+    old_owners = keyword_owners(old_map)
+    new_owners = keyword_owners(new_map)
+    return {keyword for keyword in old_owners.keys() | new_owners.keys()
+            if old_owners.get(keyword) != new_owners.get(keyword)}
+
+
+class Recategorization:
+    """
+    Works out which categories change after a category map edit, without matching every description again.
+
+    The keywords the edit touched are joined into one pattern that filters the distinct descriptions in a single
+    vectorised pass. Only the descriptions it finds are matched against the new map's automaton; every other
+    description keeps the category it already has.
+
+    Parameters:
+    old_map (dict): The category map before the edit.
+    new_map (dict): The category map after the edit.
+    """
+
+    def __init__(self, old_map, new_map):
+        keywords = changed_keywords(old_map, new_map)
+        self.full = keywords is None
+        # Longest first, so an alternation never stops at a shorter keyword the pattern could still extend
+        self.pattern = '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)) \
+            if keywords else None
+        self.matcher = CategoryMatcher(new_map)
+
+    @property
+    def unchanged(self):
+        return not self.full and self.pattern is None
+
+    def affected(self, descriptions):
+        """
+        Finds the descriptions whose category can differ under the new map and matches them against it.
+
+        Parameters:
+        descriptions (Series): Distinct raw descriptions.
+
+        Returns:
+        tuple: (positions of the affected descriptions, ndarray of their categories under the new map)
+        """
+        if self.unchanged or descriptions.empty:
+            return np.array([], dtype=np.intp), np.array([], dtype=object)
+
+        normalised = normalise_descriptions(descriptions)
+        if self.full:
+            mask = normalised.notna()
+        else:
+            mask = normalised.str.contains(self.pattern, regex=True).fillna(False)
+
+        positions = np.flatnonzero(mask.to_numpy(dtype=bool))
+        categories = np.array([self.matcher.match(description)
+                               for description in normalised.to_numpy(dtype=object)[positions]], dtype=object)
+        return positions, categories
+
+    def apply(self, df):
+        """
+        Updates the 'Category' column of a processed statement in place, writing only the rows that change.
+
+        Parameters:
+        df (DataFrame): The processed statement.
+
+        Returns:
+        ndarray: The positions of the rows whose category changed.
+        """
+        if self.unchanged or df.empty:
+            return np.array([], dtype=np.intp)
+
+        # Factorized before normalising, so each distinct description is normalised and matched once
+        codes, uniques = pd.factorize(df['Description'].astype(object))
+        positions, new_categories = self.affected(pd.Series(uniques, dtype=object))
+        if not len(positions):
+            return np.array([], dtype=np.intp)
+
+        lookup = np.full(len(uniques), None, dtype=object)
+        lookup[positions] = new_categories
+        affected = np.flatnonzero(np.isin(codes, positions))
+        categories = lookup[codes[affected]]
+        differs = categories != df['Category'].to_numpy(dtype=object)[affected]
+
+        changed = affected[differs]
+        if len(changed):
+            df.iloc[changed, df.columns.get_loc('Category')] = categories[differs]
+        return changed
@@ -0,0 +1,84 @@
+# screens.py
+
+
+class Screen:
+    """
+    A built screen kept alive between visits.
+
+    Parameters:
+    frame (Widget): The screen's top-level frame, packed into the root window.
+    key (hashable): The state the screen was built from. A different key means the screen is out of date.
+    """
+
+    def __init__(self, frame, key):
+        self.frame = frame
+        self.key = key
+        self.pack_info = None
+
+
+class ScreenManager:
+    """
+    Keeps the screens of the current statement built while the user moves between them.
+
+    Leaving a screen hides its frame with pack_forget instead of destroying it, and coming back packs it again
+    exactly as it was, so the table, graphs and summary are only built once for the data they show. A screen is
+    rebuilt when it is shown with a key different from the one it was built with, and clear() drops every
+    screen when the statement itself changes.
+    """
+
+    def __init__(self):
+        self.screens = {}
+
+    def add(self, name, frame, key=None):
+        """
+        Registers a screen that has just been built and packed, replacing any earlier screen with that name.
+        """
+        self.discard(name)
+        self.screens[name] = Screen(frame, key)
+
+    def show(self, name, key=None):
+        """
+        Shows a cached screen again.
+
+        Returns:
+        bool: True if the screen was shown, False if there is none for this key and it needs building. An out
+        of date screen is destroyed.
+        """
+        screen = self.screens.get(name)
+        if screen is None:
+            return False
+        if screen.key != key or not screen.frame.winfo_exists():
+            self.discard(name)
+            return False
+
+        if screen.pack_info is not None:
+            screen.frame.pack(**screen.pack_info)
+            screen.pack_info = None
+        return True
+
+    def hide_all(self):
+        """
+        Hides every cached screen that is on display, remembering how each one was packed.
+        """
+        for name, screen in list(self.screens.items()):
+            if not screen.frame.winfo_exists():
+                del self.screens[name]
+            elif screen.pack_info is None and screen.frame.winfo_manager() == 'pack':
+                screen.pack_info = {option: value for option, value in screen.frame.pack_info().items()
+                                    if option != 'in'}
+                screen.frame.pack_forget()
+
+    def owns(self, widget):
+        return any(screen.frame is widget for screen in self.screens.values())
+
+    def discard(self, name):
+        screen = self.screens.pop(name, None)
+        if screen is not None and screen.frame.winfo_exists():
+            screen.frame.destroy()
+
+    def clear(self):
+        """
+        Destroys every cached screen, for when the data they show has changed.
+        """
+        for name in list(self.screens):
+            self.discard(name)
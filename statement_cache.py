@@ -0,0 +1,149 @@
+# statement_cache.py
+
+import hashlib
+import os
+import pickle
+import threading
+
+STATEMENT_CACHE_DIR = 'statement_cache'
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# Bump whenever prepare_statement changes the frames it returns, so older entries are never read back
+CACHE_FORMAT_VERSION = 3
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def statement_cache_key(file_path, category_digest):
+    """
+    Returns the cache key of a statement: its contents, the category map it was categorized with and the
+    cache format.
+
+    Parameters:
+    file_path (str): Path to the statement CSV file.
+    category_digest (str): Digest of the category map in use.
+
+    Returns:
+    str: A hex key, safe to use as a file name.
+    """
+    return content_cache_key(file_digest(file_path), category_digest)
+
+
+def content_cache_key(content_digest, category_digest):
+    """
+    Returns the cache key of a statement identified by a digest of its contents rather than by a file.
+
+    Parameters:
+    content_digest (str): A string that changes whenever the statement's transactions change.
+    category_digest (str): Digest of the category map in use.
+
+    Returns:
+    str: A hex key, safe to use as a file name.
+    """
+    key = f"{CACHE_FORMAT_VERSION}:{content_digest}:{category_digest}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class StatementCache:
+    """
+    An on-disk cache of processed statements, stored as pickle protocol 5 files.
+
+    Entries are never updated in place: a changed file or category map gives a new key. Reading an entry
+    touches its modification time, and once the directory grows past max_bytes the entries with the oldest
+    times are removed, so eviction is least recently used.
+
+    Parameters:
+    cache_dir (str): Directory holding the cache files.
+    max_bytes (int): Size the cache is trimmed back to after every write.
+    """
+
+    def __init__(self, cache_dir=STATEMENT_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def get(self, key):
+        """
+        Returns the cached value for key, or None if it is missing or unreadable.
+        """
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            # A truncated or incompatible entry is a miss; drop it so it is rebuilt
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """
+        Stores value under key. The file is written under a temporary name and renamed into place, so
+        readers on other threads never see a partial entry.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=5)
+            os.replace(temp_path, path)
+        except OSError:
+            self._remove(temp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        """
+        with self._lock:
+            entries = []
+            with os.scandir(self.cache_dir) as scan:
+                for entry in scan:
+                    if entry.name.endswith('.pkl'):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+statement_cache = StatementCache()
@@ -0,0 +1,141 @@
+# summary.py
+
+import pandas as pd
+
+
+class TransactionSummary:
+    """
+    Summary statistics for one side (debits or credits) of a statement.
+
+    Parameters:
+    by_category (DataFrame): One row per category with 'Category', 'total', 'min_transaction', 'max_transaction',
+    'avg_transaction' and 'transaction_count' columns, rounded to cents.
+    overall_min (float): Smallest absolute transaction, or None if there are no transactions.
+    overall_max (float): Largest absolute transaction, or None if there are no transactions.
+    total (float): Total of all transactions.
+    """
+
+    def __init__(self, by_category, overall_min, overall_max, total):
+        self.by_category = by_category
+        self.overall_min = overall_min
+        self.overall_max = overall_max
+        self.total = total
+
+    @property
+    def largest_category(self):
+        if self.by_category.empty:
+            return None
+        return self.by_category.loc[self.by_category['total'].idxmax()]
+
+    @property
+    def smallest_category(self):
+        if self.by_category.empty:
+            return None
+        return self.by_category.loc[self.by_category['total'].idxmin()]
+
+    def as_debits(self):
+        """
+        Returns the summary in the dictionary layout the summary screens use for debits.
+        """
+        return {
+            'summary': self.by_category.rename(columns={'total': 'total_spending'}),
+            'overall_min': self.overall_min,
+            'overall_max': self.overall_max,
+            'total_spent': self.total,
+            'most_expensive': _rename_total(self.largest_category, 'total_spending'),
+            'least_expensive': _rename_total(self.smallest_category, 'total_spending')
+        }
+
+    def as_credits(self):
+        """
+        Returns the summary in the dictionary layout the summary screens use for credits.
+        """
+        return {
+            'summary': self.by_category.rename(columns={'total': 'total_income'}),
+            'overall_min': self.overall_min,
+            'overall_max': self.overall_max,
+            'total_made': self.total,
+            'most_profitable': _rename_total(self.largest_category, 'total_income'),
+            'least_profitable': _rename_total(self.smallest_category, 'total_income')
+        }
+
+
+def _rename_total(row, name):
+    return row.rename({'total': name}) if row is not None else None
+
+
+def summarise_transactions(df, amount_column, absolute_total=False):
+    """
+    Computes per-category and overall statistics for one amount column.
+
+    Only built-in aggregations are used, on pre-computed absolute amount columns, so pandas runs them all on
+    its compiled groupby path. The average is taken over whole cents, as RunningTotals does, so both round a
+    half cent the same way. Results are rounded once at the end.
+
+    Parameters:
+    df (DataFrame): The transactions, with 'Category' and amount_column columns.
+    amount_column (str): 'Debit' or 'Credit'.
+    absolute_total (bool): Report totals as absolute values, for debits stored as negative amounts.
+
+    Returns:
+    TransactionSummary: The summary statistics.
+    """
+    columns = ['Category', 'total', 'min_transaction', 'max_transaction', 'avg_transaction', 'transaction_count']
+    if 'Category' not in df.columns or df.empty:
+        by_category = pd.DataFrame(columns=columns)
+    else:
+        amounts = pd.DataFrame({'Category': df['Category'], 'amount': df[amount_column],
+                                'abs_amount': df[amount_column].abs(),
+                                'abs_cents': (df[amount_column].abs() * 100).round()})
+        by_category = amounts.groupby('Category').agg(
+            total=('amount', 'sum'),
+            min_transaction=('abs_amount', 'min'),
+            max_transaction=('abs_amount', 'max'),
+            avg_transaction=('abs_cents', 'mean'),
+            transaction_count=('abs_amount', 'count')
+        )
+        by_category['avg_transaction'] = by_category['avg_transaction'] / 100
+        if absolute_total:
+            by_category['total'] = by_category['total'].abs()
+        by_category = by_category.round(2).reset_index()
+
+    if df.empty:
+        return TransactionSummary(by_category, None, None, 0)
+
+    abs_amounts = df[amount_column].abs()
+    total = abs_amounts.sum() if absolute_total else df[amount_column].sum()
+    return TransactionSummary(by_category, abs_amounts.min(), abs_amounts.max(), total)
+
+
+def summarise_statement(debits_df, credits_df):
+    """
+    Summarises the debits and credits of a statement that already has its exclusions removed.
+
+    Parameters:
+    debits_df (DataFrame): DataFrame containing debit transactions.
+    credits_df (DataFrame): DataFrame containing credit transactions.
+
+    Returns:
+    dict: A dictionary containing summary data for both debits and credits.
+    """
+    return {
+        'debits': summarise_transactions(debits_df, 'Debit', absolute_total=True).as_debits(),
+        'credits': summarise_transactions(credits_df, 'Credit').as_credits()
+    }
+
+
+def category_totals(debits_df, credits_df):
+    """
+    Sums the debits and credits of a statement by category, the data behind each plot type of the graph view.
+
+    Parameters:
+    debits_df (DataFrame): Debit transactions, with excluded transactions already removed.
+    credits_df (DataFrame): Credit transactions, with excluded transactions already removed.
+
+    Returns:
+    dict: 'debits' and 'credits' Series of totals indexed by category.
+    """
+    return {
+        'debits': debits_df.groupby('Category')['Debit'].sum(),
+        'credits': credits_df.groupby('Category')['Credit'].sum()
+    }
@@ -0,0 +1,96 @@
+# timeseries.py
+
+import pandas as pd
+
+# granularity -> pandas period frequency
+GRANULARITIES = {'day': 'D', 'week': 'W', 'month': 'M'}
+# plot type -> (amount column, cube measure)
+MEASURES = {'debits': ('Debit', 'spent'), 'credits': ('Credit', 'received')}
+
+
+class SpendingCube:
+    """
+    Debit and credit sums and counts aggregated by period and category.
+
+    The transactions are grouped once, by day and category. Weeks and months are rolled up from the daily
+    level the first time they are asked for and kept, so changing the granularity or the category filter only
+    re-slices these small tables and never goes back to the transactions.
+
+    Parameters:
+    daily (DataFrame): Indexed by ('Date', 'Category'), with 'spent', 'spent_count', 'received' and
+    'received_count' columns.
+    """
+
+    def __init__(self, daily):
+        self.levels = {'day': daily}
+
+    @classmethod
+    def from_statement(cls, debits_df, credits_df):
+        """
+        Builds the cube from a statement's parsed 'Date' column.
+
+        Parameters:
+        debits_df (DataFrame): Debit transactions, with excluded transactions already removed.
+        credits_df (DataFrame): Credit transactions, with excluded transactions already removed.
+
+        Returns:
+        SpendingCube: The cube. Transactions without a date are left out.
+        """
+        sides = []
+        for df, (amount_column, measure) in zip((debits_df, credits_df), MEASURES.values()):
+            amounts = pd.DataFrame({'Date': df['Date'].dt.normalize(), 'Category': df['Category'],
+                                    'amount': df[amount_column].abs()}).dropna(subset=['Date'])
+            grouped = amounts.groupby(['Date', 'Category'])['amount'].agg(['sum', 'count'])
+            sides.append(grouped.set_axis([measure, f'{measure}_count'], axis=1))
+
+        daily = pd.concat(sides, axis=1).fillna(0)
+        for _, measure in MEASURES.values():
+            daily[f'{measure}_count'] = daily[f'{measure}_count'].astype('int64')
+        return cls(daily.sort_index())
+
+    @property
+    def categories(self):
+        return sorted(self.levels['day'].index.get_level_values('Category').unique())
+
+    def level(self, granularity):
+        """
+        Returns the cube at one granularity.
+
+        Parameters:
+        granularity (str): 'day', 'week' or 'month'.
+
+        Returns:
+        DataFrame: Indexed by (period start, category), with the sum and count columns.
+        """
+        if granularity not in self.levels:
+            daily = self.levels['day'].reset_index()
+            daily['Date'] = daily['Date'].dt.to_period(GRANULARITIES[granularity]).dt.start_time
+            self.levels[granularity] = daily.groupby(['Date', 'Category']).sum()
+        return self.levels[granularity]
+
+    def trend(self, granularity, plot_type, categories=None):
+        """
+        Totals one measure per period, over every category or just the given ones.
+
+        Parameters:
+        granularity (str): 'day', 'week' or 'month'.
+        plot_type (str): 'debits' or 'credits'.
+        categories (list): The categories to include. None includes all of them.
+
+        Returns:
+        Series: Totals indexed by period start, with one entry for every period from the first to the last
+        transaction of the measure, so a period with no transactions is 0 rather than missing. Empty if the
+        measure has no transactions.
+        """
+        _, measure = MEASURES[plot_type]
+        level = self.level(granularity)
+        # Rows of the other measure only, zero-filled when the two sides were joined, do not count as periods
+        values = level.loc[level[f'{measure}_count'] > 0, measure]
+        if categories is not None:
+            values = values[values.index.get_level_values('Category').isin(categories)]
+
+        totals = values.groupby(level='Date').sum()
+        if totals.empty:
+            return totals
+        periods = pd.period_range(totals.index.min(), totals.index.max(), freq=GRANULARITIES[granularity])
+        return totals.reindex(periods.start_time, fill_value=0)
@@ -0,0 +1,236 @@
+# totals.py
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from exclusions import transaction_types
+from summary import TransactionSummary
+
+
+def to_cents(values):
+    """
+    Converts a column of amounts to whole cents, so running totals never drift. Missing amounts count as 0.
+    """
+    return np.round(np.nan_to_num(values.to_numpy(dtype=float)) * 100).astype(np.int64)
+
+
+class CategoryStats:
+    """
+    Running aggregates of the included transactions of one type in one category.
+
+    Amounts are absolute values in cents. The heaps hold (amount, position) pairs and are cleaned lazily:
+    entries for excluded rows, or rows recategorized away, are only dropped when they reach the top. A row keeps
+    at most one entry per heap, since a stale entry becomes live again when the row comes back, so toggling a
+    row never grows the heaps.
+    """
+
+    def __init__(self, amounts=(), positions=()):
+        amounts = np.asarray(amounts, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.int64)
+        self.total = int(amounts.sum())
+        self.count = len(amounts)
+        # A sorted list is already a valid heap
+        order = np.lexsort((positions, amounts))
+        self.min_heap = [(int(amounts[i]), int(positions[i])) for i in order]
+        self.max_heap = [(-amount, position) for amount, position in reversed(self.min_heap)]
+        # Positions with an entry in each heap, live or stale
+        self.in_min_heap = set(positions.tolist())
+        self.in_max_heap = set(self.in_min_heap)
+        # Positions moved to another category; their heap entries are stale
+        self.moved = set()
+
+    def add(self, amount, position):
+        self.total += amount
+        self.count += 1
+        self.moved.discard(position)
+        if position not in self.in_min_heap:
+            self.in_min_heap.add(position)
+            heapq.heappush(self.min_heap, (amount, position))
+        if position not in self.in_max_heap:
+            self.in_max_heap.add(position)
+            heapq.heappush(self.max_heap, (-amount, position))
+
+    def remove(self, amount):
+        self.total -= amount
+        self.count -= 1
+
+    def move_out(self, amount, position):
+        self.remove(amount)
+        self.moved.add(position)
+
+    def minimum(self, included):
+        while self.min_heap and (not included[self.min_heap[0][1]] or self.min_heap[0][1] in self.moved):
+            self.in_min_heap.discard(heapq.heappop(self.min_heap)[1])
+        return self.min_heap[0][0] if self.min_heap else None
+
+    def maximum(self, included):
+        while self.max_heap and (not included[self.max_heap[0][1]] or self.max_heap[0][1] in self.moved):
+            self.in_max_heap.discard(heapq.heappop(self.max_heap)[1])
+        return -self.max_heap[0][0] if self.max_heap else None
+
+
+class RunningTotals:
+    """
+    Totals and per-category aggregates of the included transactions of a statement.
+
+    Everything is computed once from the DataFrame; afterwards including or excluding a transaction only
+    applies that row's delta, so a toggle costs the same no matter how long the statement is.
+
+    Parameters:
+    df (DataFrame): The processed statement.
+    included (ndarray): Boolean include state per row.
+    """
+
+    def __init__(self, df, included):
+        self.included = np.array(included, dtype=bool)
+        self.debit_cents = to_cents(df['Debit'])
+        self.credit_cents = to_cents(df['Credit'])
+        self.balances = df['Balance'].to_numpy() if 'Balance' in df.columns else np.zeros(len(df))
+        self.types = transaction_types(df)
+        # Copied explicitly: to_numpy can return a view of a str column even with copy=True
+        self.categories = df['Category'].to_numpy(dtype=object).copy()
+        self.ids = df.index
+
+        self.total_debit_cents = int(self.debit_cents[self.included].sum())
+        self.total_credit_cents = int(self.credit_cents[self.included].sum())
+
+        # Max-heap (negated) of included positions, for the ending balance, and which positions have an entry
+        self.last_heap = [-position for position in np.flatnonzero(self.included)[::-1].tolist()]
+        self.in_last_heap = self.included.copy()
+
+        self.amounts = np.abs(np.where(self.types == 'Debit', self.debit_cents, self.credit_cents))
+        # Only rows with exactly one of Debit and Credit set belong to a side, as in the debit and credit frames
+        self.sided = df['Debit'].notna().to_numpy() != df['Credit'].notna().to_numpy()
+        self.category_stats = {}
+        included_positions = np.flatnonzero(self.included & self.sided)
+        groups = pd.DataFrame({'type': self.types[included_positions],
+                               'category': self.categories[included_positions]}).groupby(['type', 'category']).indices
+        for key, group in groups.items():
+            positions = included_positions[group]
+            self.category_stats[key] = CategoryStats(self.amounts[positions], positions)
+
+    def positions_for(self, transaction_id):
+        """
+        Returns the position of the row with the given transaction ID, as a list that is empty if there is none.
+        """
+        positions = self.ids.get_indexer_for([transaction_id])
+        return positions[positions >= 0].tolist()
+
+    def set_included(self, positions, included):
+        """
+        Includes or excludes the rows at the given positions, applying only their deltas.
+        """
+        for position in positions:
+            if self.included[position] == included:
+                continue
+            self.included[position] = included
+
+            sign = 1 if included else -1
+            self.total_debit_cents += sign * int(self.debit_cents[position])
+            self.total_credit_cents += sign * int(self.credit_cents[position])
+
+            if included and not self.in_last_heap[position]:
+                self.in_last_heap[position] = True
+                heapq.heappush(self.last_heap, -position)
+
+            if not self.sided[position]:
+                continue
+            key = (str(self.types[position]), str(self.categories[position]))
+            amount = int(self.amounts[position])
+            if included:
+                self.category_stats.setdefault(key, CategoryStats()).add(amount, position)
+            else:
+                self.category_stats[key].remove(amount)
+
+    def set_categories(self, positions, categories):
+        """
+        Moves the rows at the given positions to new categories after a recategorization, updating only the
+        aggregates of the categories involved.
+
+        Parameters:
+        positions (iterable): Positions of the rows whose category changed.
+        categories (iterable): The new category of each row.
+        """
+        for position, category in zip(positions, categories):
+            old_category = self.categories[position]
+            if old_category == category:
+                continue
+            self.categories[position] = category
+            if not self.included[position] or not self.sided[position]:
+                continue
+
+            transaction_type = str(self.types[position])
+            amount = int(self.amounts[position])
+            self.category_stats[(transaction_type, str(old_category))].move_out(amount, position)
+            self.category_stats.setdefault((transaction_type, str(category)), CategoryStats()).add(amount, position)
+
+    @property
+    def total_debits(self):
+        return self.total_debit_cents / 100
+
+    @property
+    def total_credits(self):
+        return self.total_credit_cents / 100
+
+    @property
+    def ending_balance(self):
+        while self.last_heap and not self.included[-self.last_heap[0]]:
+            self.in_last_heap[-heapq.heappop(self.last_heap)] = False
+        return self.balances[-self.last_heap[0]] if self.last_heap else 0
+
+    def category_summary(self, transaction_type):
+        """
+        Returns the running aggregates of one transaction type.
+
+        Parameters:
+        transaction_type (str): 'Debit' or 'Credit'.
+
+        Returns:
+        dict: Category -> dict with total, count, min, max and average (absolute amounts) of the included transactions.
+        """
+        summary = {}
+        for (stats_type, category), stats in self.category_stats.items():
+            if stats_type == transaction_type and stats.count:
+                summary[category] = {
+                    'total': stats.total / 100,
+                    'count': stats.count,
+                    'min': stats.minimum(self.included) / 100,
+                    'max': stats.maximum(self.included) / 100,
+                    'average': stats.total / stats.count / 100,
+                }
+        return summary
+
+    def transaction_summary(self, transaction_type):
+        """
+        Returns the summary statistics of one transaction type, built from the running aggregates.
+
+        Parameters:
+        transaction_type (str): 'Debit' or 'Credit'.
+
+        Returns:
+        TransactionSummary: The same statistics summarise_transactions computes from the transactions.
+        """
+        columns = ['Category', 'total', 'min_transaction', 'max_transaction', 'avg_transaction', 'transaction_count']
+        summary = self.category_summary(transaction_type)
+        if not summary:
+            return TransactionSummary(pd.DataFrame(columns=columns), None, None, 0)
+
+        by_category = pd.DataFrame([(category, stats['total'], stats['min'], stats['max'],
+                                     stats['average'], stats['count'])
+                                    for category, stats in sorted(summary.items())], columns=columns).round(2)
+        return TransactionSummary(by_category,
+                                  min(stats['min'] for stats in summary.values()),
+                                  max(stats['max'] for stats in summary.values()),
+                                  round(sum(stats['total'] for stats in summary.values()), 2))
+
+    def statement_summary(self):
+        """
+        Returns the summary of the included transactions in the layout summarise_statement returns, without
+        grouping the transactions again.
+        """
+        return {
+            'debits': self.transaction_summary('Debit').as_debits(),
+            'credits': self.transaction_summary('Credit').as_credits()
+        }
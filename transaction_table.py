@@ -0,0 +1,117 @@
+# transaction_table.py
+
+from tkinter import ttk
+
+
+class TransactionTable(ttk.Frame):
+    """
+    A windowed transaction table. Only the rows that fit on screen exist as Treeview items, and they
+    are refilled from the DataFrame as the user scrolls, so opening and scrolling cost the same for
+    any statement length.
+
+    Parameters:
+    parent (Widget): The parent widget.
+    dataframe (DataFrame): The transactions to show.
+    columns (list): The DataFrame columns to show. An 'Include' column is added after them.
+    included (ndarray): Boolean include state per row. It is shared with the caller, not copied.
+    on_toggle (func): Called with a row position when that row's 'Include' cell is clicked.
+    """
+
+    def __init__(self, parent, dataframe, columns, included, on_toggle):
+        super().__init__(parent)
+        self.dataframe = dataframe
+        self.columns = list(columns)
+        self.included = included
+        self.on_toggle = on_toggle
+        self.offset = 0
+        self.visible_rows = 0
+
+        style_row_height = ttk.Style().lookup("Treeview", "rowheight")
+        self.row_height = int(style_row_height) if style_row_height else 20
+
+        self.tree = ttk.Treeview(self, columns=self.columns + ["Include"], show='headings')
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", expand=True, fill="both")
+
+        for col in self.columns + ["Include"]:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, anchor="center")
+
+        self.tree.bind("<Configure>", self.resize)
+        self.tree.bind("<ButtonRelease-1>", self.click)
+        self.tree.bind("<MouseWheel>", self.mouse_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible_rows))
+        self.tree.bind("<Home>", lambda event: self.scroll(-len(self.dataframe)))
+        self.tree.bind("<End>", lambda event: self.scroll(len(self.dataframe)))
+
+    def resize(self, event):
+        # One row's worth of height goes to the headings
+        visible_rows = max(1, event.height // self.row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.refresh()
+
+    def refresh(self):
+        """
+        Redraws the visible rows from the DataFrame and the include state.
+        """
+        total = len(self.dataframe)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        end = min(self.offset + self.visible_rows, total)
+
+        rows = self.dataframe.iloc[self.offset:end][self.columns].itertuples(index=False, name=None)
+        shown = 0
+        for slot, values in enumerate(rows):
+            include_text = "Included" if self.included[self.offset + slot] else "Excluded"
+            iid = str(slot)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values + (include_text,))
+            else:
+                self.tree.insert("", "end", iid=iid, values=values + (include_text,))
+            shown += 1
+
+        for iid in self.tree.get_children()[shown:]:
+            self.tree.delete(iid)
+
+        if total:
+            self.scrollbar.set(self.offset / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def refresh_rows(self, positions):
+        """
+        Redraws the 'Include' cell of the given rows, if they are on screen.
+        """
+        for position in positions:
+            slot = position - self.offset
+            if 0 <= slot < self.visible_rows and self.tree.exists(str(slot)):
+                self.tree.set(str(slot), "Include", "Included" if self.included[position] else "Excluded")
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.refresh()
+        return "break"
+
+    def yview(self, *args):
+        """
+        Handles the scrollbar's 'moveto' and 'scroll' commands.
+        """
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.dataframe))
+            self.refresh()
+        elif args[0] == "scroll":
+            rows = int(args[1]) * (self.visible_rows if args[2] == "pages" else 1)
+            self.scroll(rows)
+
+    def mouse_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def click(self, event):
+        item_id = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+        if item_id and column == f"#{len(self.columns) + 1}":
+            self.on_toggle(self.offset + int(item_id))